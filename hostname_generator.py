@@ -10,13 +10,146 @@ import yaml
 import json
 import re
 import csv
-from urllib.parse import urlparse
-from typing import Dict, List, Set, Union, Tuple
+from urllib.parse import urlparse, urlsplit
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Union, Tuple
 import argparse
+import hashlib
 import sys
-import time
 import os
-from collections import OrderedDict, defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain, compress, islice
+from operator import not_
+from os.path import commonprefix
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 优先使用 libyaml 提供的 C 实现加载/输出 YAML，不可用时回退到纯 Python 实现
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
+# 预编译的域名 / IP 校验正则（模块加载时编译一次，避免逐行重复编译）
+# 域名：总长不超过 255，至少两段，每段 1-63 个字母数字或连字符且首尾不为连字符，TLD 至少 2 个字符
+_DOMAIN_RE = re.compile(
+    r'^(?=.{1,255}\Z)'
+    r'(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+'
+    r'[A-Za-z0-9][A-Za-z0-9-]{0,61}[A-Za-z0-9]\Z'
+)
+# 传统清理方式中需要移除的字符（空格和特殊字符）
+_CLEAN_RE = re.compile(r'[^\w.-]')
+# v2ray 规则：前缀:域名[:标签...]（行末注释在匹配前移除）
+_V2RAY_RULE_RE = re.compile(r'([^:]*):([^:]*)(?::(.*))?\Z', re.DOTALL)
+# http(s) URL 的 netloc 部分（到第一个 / ? # 为止），用于跳过 urlsplit 的快速路径
+_FAST_URL_RE = re.compile(r'https?://([^/?#]*)')
+# uBlock 规则格式（按优先级排列，每个格式只有一个捕获组：域名）
+_UBLOCK_RULE_PATTERNS = [re.compile(pattern) for pattern in (
+    # 🔧 新增：*.domain.com/* 格式 (通配符域名)
+    r'^\*\.([a-zA-Z0-9.-]+)(?:/.*)?(?:\*)?$',
+    # 🔧 新增：*.domain.com/path/* 格式
+    r'^\*\.([a-zA-Z0-9.-]+)/.*(?:\*)?$',
+    # 原有：*://*.domain.com/* 或 *://*.domain.com (通配符子域名)
+    r'^\*://\*\.([a-zA-Z0-9.-]+)(?:/.*)?$',
+    # 原有：*://domain.com/* 或 *://domain.com (无通配符)
+    r'^\*://([a-zA-Z0-9.-]+)(?:/.*)?$',
+    # 🔧 新增：https://domain.com/* 格式
+    r'^https?://([a-zA-Z0-9.-]+)(?:/.*)?$',
+    # 原有：||domain.com^ 或 ||domain.com/path
+    r'^\|\|([a-zA-Z0-9.-]+)(?:/.*)?(?:\^)?$',
+    # 🔧 新增：domain.com/* 格式
+    r'^([a-zA-Z0-9.-]+)/.*(?:\*)?$',
+    # 原有：普通域名格式
+    r'^([a-zA-Z0-9.-]+)(?:/.*)?$',
+    # 🔧 修复：domain.com* 格式（不带斜杠的通配符）
+    r'^([a-zA-Z0-9.-]+)\*$',
+)]
+# 全部格式的合并正则：第 N 个格式命中时 lastindex 为 N（从 1 开始）
+_UBLOCK_RULE_RE = re.compile(
+    '|'.join(f'(?:{pattern.pattern})' for pattern in _UBLOCK_RULE_PATTERNS)
+)
+# uBlock 规则无法按格式解析时的后备方案：规则中任意位置形如域名的片段
+_DOMAIN_FALLBACK_RE = re.compile(r'([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')
+# 非空行（去除首尾空白），效果等同于 split('\n') 后逐行 strip() 并丢弃空行
+_LINE_RE = re.compile(r'^[^\S\n]*(\S(?:[^\n]*\S)?)', re.MULTILINE)
+_IPV4_RE = re.compile(
+    r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}'
+    r'(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
+)
+
+# 合并规则外层包装（(?:.*\.)?、TLD 分组、$ 等）长度的保守上界
+_RULE_WRAPPER_SLACK = 32
+
+# 读取响应体中途可能出现的错误（此时请求已成功返回，urllib3 不会重试）
+_BODY_READ_ERRORS = (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError)
+
+# 自定义规则文件累加到全局统计中的统计项
+_CUSTOM_SOURCE_STAT_KEYS = (
+    'total_rules', 'parsed_domains', 'invalid_domains', 'ignored_comments',
+    'csv_parsed_rows', 'csv_invalid_urls', 'csv_extracted_domains',
+)
+
+
+class AutoClassifyRule(NamedTuple):
+    """
+    自动分类规则
+    replace 规则的 domain 为被替换的原域名，new_domain 为替换后的域名
+    """
+    action: str
+    domain: str
+    new_domain: Optional[str] = None
+
+
+@lru_cache(maxsize=1 << 16)
+def _extract_hostname(url_string: str) -> str:
+    """
+    从 URL 字符串中提取 hostname（带缓存，同一站点的大量 URL 只解析一次）
+
+    Args:
+        url_string: URL 字符串
+
+    Returns:
+        提取的 hostname，如果失败返回 None
+    """
+    url_string = url_string.strip()
+
+    # 如果没有协议，尝试添加 http://
+    if not url_string.startswith(('http://', 'https://', 'ftp://')):
+        # 检查是否看起来像一个完整的域名
+        if '.' in url_string and not url_string.startswith('/'):
+            url_string = 'http://' + url_string
+        else:
+            return None
+
+    # 快速路径：常见的 http(s)://host/... 直接用正则取出主机名；
+    # 含方括号（IPv6）或非 ASCII 字符的 netloc 交给 urlsplit 处理其校验逻辑
+    match = _FAST_URL_RE.match(url_string)
+    if match:
+        netloc = match.group(1)
+        if netloc.isascii() and '[' not in netloc and ']' not in netloc:
+            hostname = netloc.split(':', 1)[0]
+            if _DOMAIN_RE.match(hostname):
+                return hostname.lower()
+
+    try:
+        hostname = urlsplit(url_string).netloc
+
+        if not hostname:
+            return None
+
+        # 移除端口号
+        if ':' in hostname:
+            hostname = hostname.split(':')[0]
+
+        # 验证域名格式
+        if _DOMAIN_RE.match(hostname):
+            return hostname.lower()
+
+    except Exception as e:
+        print(f"  ❌ URL 解析失败: {url_string} - {e}")
+
+    return None
 
 class SearXNGHostnamesGenerator:
     def __init__(self, config_file: str = None, force_single_regex: bool = False):
@@ -31,7 +164,19 @@ class SearXNGHostnamesGenerator:
         self.force_single_regex = force_single_regex
         self.domains = set()
         self.auto_classify_rules = []  # 自动分类规则
-        self.stats = {
+        # 自动分类规则的查找索引（由 _index_auto_classify_rules 构建）
+        self._skip_by_domain = {}       # 精确 skip 规则: 小写域名 -> (序号, 动作, 规则域名)
+        self._classify_by_domain = {}   # 精确分类规则: 小写域名 -> (序号, 动作, 规则域名)
+        self._skip_wildcards = {}       # 通配符 skip 规则: 匹配域名 -> (序号, 动作, 规则域名)
+        self._classify_wildcards = {}   # 通配符分类规则: 匹配域名 -> (序号, 动作, 规则域名)
+        self._replace_rules = {}        # 替换规则: 原域名的正则表达式 -> 新域名
+        self._all_by_domain = {}        # 全部精确规则: 小写域名 -> [(序号, 动作, 规则域名), ...]
+        self._all_wildcards = {}        # 全部通配符规则: 匹配域名 -> [(序号, 动作, 规则域名), ...]
+        self._parse_fingerprint = None  # 解析结果缓存的配置指纹（由 _parsed_cache_key 计算）
+        self._prefetched_content = {}   # 预取中的数据源内容: URL -> Future（由 collect_domains 提交）
+        self._esc_cache = {}            # re.escape 结果缓存: 原字符串 -> 转义后字符串
+        # 统计信息使用 Counter：未出现的键读取为 0，可直接批量累加
+        self.stats = Counter({
             'total_rules': 0,
             'parsed_domains': 0,
             'ignored_with_path': 0,
@@ -49,7 +194,7 @@ class SearXNGHostnamesGenerator:
             'csv_invalid_urls': 0,  # CSV 中无效 URL 的数量
             'csv_extracted_domains': 0,  # CSV 中成功提取的域名数量
             'wildcard_rules_processed': 0,  # 🔧 处理的通配符规则数量
-        }
+        })
         # 记录每个类别的域名数量
         self.category_domain_counts = {
             'remove': 0,
@@ -58,9 +203,287 @@ class SearXNGHostnamesGenerator:
             'replace': 0
         }
 
+        # 共享的 HTTP 会话（连接复用 + 自动重试）
+        self.session = self._create_session()
+
         # 加载自动分类规则
         self.load_auto_classify_rules()
 
+    def _create_session(self) -> requests.Session:
+        """
+        创建带连接池和重试策略的 HTTP 会话
+
+        Returns:
+            配置好的 requests.Session
+        """
+        request_config = self.config["request_config"]
+        max_workers = request_config.get("max_workers", 16)
+
+        # retry_count 表示总尝试次数，urllib3 的 total 表示重试次数
+        retry = Retry(
+            total=max(request_config["retry_count"] - 1, 0),
+            backoff_factor=request_config["retry_delay"],
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry
+        )
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        return session
+
+    def _cached_get(self, url: str, log: Callable[[str], None] = print) -> str:
+        """
+        带磁盘缓存的条件 GET 请求，返回完整响应文本
+        解码后的响应块直接拼接为整段文本（同时写入缓存），不经过逐行切分；
+        读取响应体中途出错时重新请求一次
+
+        Args:
+            url: 请求地址
+            log: 状态信息输出函数（在工作线程中调用时用于收集信息，由调用方统一输出）
+
+        Returns:
+            响应文本
+
+        Raises:
+            requests.RequestException: 请求失败
+        """
+        for attempt in range(2):
+            response, body_path, meta = self._cached_request(url, log)
+            if response is None:
+                with open(body_path, 'r', encoding='utf-8', newline='') as f:
+                    return f.read()
+
+            try:
+                return ''.join(self._iter_response_chunks(response, body_path, meta, log))
+            except _BODY_READ_ERRORS as e:
+                # 流式读取时响应体中途断开不会被 urllib3 重试，这里重新请求一次
+                if attempt:
+                    raise
+                log(f"  ⚠️  读取响应中断，重新请求: {url} ({e})")
+
+    def _cached_get_lines(self, url: str, log: Callable[[str], None] = print) -> Iterator[str]:
+        """
+        带磁盘缓存的条件 GET 请求，以行迭代器的形式流式返回响应内容
+        请求在调用时立即发出，内容在迭代时边下载边解析，完整读取后才写入缓存；
+        已产出的行无法撤回，因此读取响应体中途出错时不会重试
+
+        Args:
+            url: 请求地址
+            log: 状态信息输出函数
+
+        Returns:
+            按 '\n' 切分的行迭代器
+
+        Raises:
+            requests.RequestException: 请求失败
+        """
+        response, body_path, meta = self._cached_request(url, log)
+        if response is None:
+            return self._iter_cached_file(body_path)
+
+        return self._split_lines(self._iter_response_chunks(response, body_path, meta, log))
+
+    def _download_source(
+        self, url: str
+    ) -> Tuple[Union[str, None], List[str], Union[Exception, None]]:
+        """
+        下载数据源的完整内容，供预取线程调用
+        下载过程中的状态信息不直接输出，而是随结果返回，由解析数据源时按顺序输出
+
+        Args:
+            url: 请求地址
+
+        Returns:
+            (响应文本，失败时为 None; 状态信息列表; 请求异常，成功时为 None)
+        """
+        messages = []
+        try:
+            return self._cached_get(url, messages.append), messages, None
+        except requests.RequestException as e:
+            return None, messages, e
+
+    def _cached_request(
+        self, url: str, log: Callable[[str], None]
+    ) -> Tuple[Union[requests.Response, None], Union[str, None], Dict]:
+        """
+        发出带磁盘缓存的条件 GET 请求
+        使用 ETag / Last-Modified 发送条件请求，上游未变化时 (304) 改为读取本地缓存
+
+        Args:
+            url: 请求地址
+            log: 状态信息输出函数
+
+        Returns:
+            (以 stream=True 发出的响应，命中本地缓存时为 None; 缓存文件路径; 缓存元数据)
+
+        Raises:
+            requests.RequestException: 请求失败
+        """
+        timeout = self.config["request_config"]["timeout"]
+        cache_dir = self.config["request_config"].get("cache_dir")
+
+        headers = {}
+        body_path = None
+
+        if cache_dir:
+            body_path = os.path.join(cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest())
+            if os.path.exists(body_path):
+                meta = {}
+                try:
+                    with open(body_path + '.meta.json', 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    pass
+
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self.session.get(url, timeout=timeout, headers=headers, stream=True)
+
+        if response.status_code == 304 and headers:
+            response.close()
+            log(f"  💾 内容未变化，使用本地缓存: {url}")
+            return None, body_path, {}
+
+        try:
+            response.raise_for_status()
+        except requests.RequestException:
+            response.close()
+            raise
+
+        # 未声明编码时按 UTF-8 解码，保证流式解码输出 str
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        if not (meta['etag'] or meta['last_modified']):
+            body_path = None
+
+        return response, body_path, meta
+
+    def _iter_response_chunks(self, response: requests.Response, body_path: str, meta: Dict,
+                              log: Callable[[str], None]) -> Iterator[str]:
+        """
+        流式读取响应的解码文本块，同时把内容写入缓存文件
+
+        Args:
+            response: 以 stream=True 发出的响应
+            body_path: 缓存文件路径，为 None 时不缓存
+            meta: 缓存元数据（etag / last_modified）
+            log: 状态信息输出函数
+
+        Returns:
+            文本块迭代器
+        """
+        cache_file = None
+        if body_path:
+            try:
+                os.makedirs(os.path.dirname(body_path), exist_ok=True)
+                cache_file = open(body_path + '.tmp', 'w', encoding='utf-8', newline='')
+            except OSError as e:
+                log(f"  ⚠️  写入缓存失败: {e}")
+
+        completed = False
+        try:
+            for chunk in response.iter_content(chunk_size=64 * 1024, decode_unicode=True):
+                if cache_file:
+                    try:
+                        cache_file.write(chunk)
+                    except OSError as e:
+                        log(f"  ⚠️  写入缓存失败: {e}")
+                        cache_file.close()
+                        os.remove(body_path + '.tmp')
+                        cache_file = None
+                yield chunk
+            completed = True
+        finally:
+            response.close()
+            if cache_file:
+                cache_file.close()
+                try:
+                    if completed:
+                        # 先写临时文件再替换，避免中断时留下不完整的缓存
+                        os.replace(body_path + '.tmp', body_path)
+                        with open(body_path + '.meta.json.tmp', 'w', encoding='utf-8') as f:
+                            json.dump(meta, f)
+                        os.replace(body_path + '.meta.json.tmp', body_path + '.meta.json')
+                    else:
+                        os.remove(body_path + '.tmp')
+                except OSError as e:
+                    log(f"  ⚠️  写入缓存失败: {e}")
+
+    def _iter_cached_file(self, body_path: str) -> Iterator[str]:
+        """
+        按行读取缓存文件
+
+        Args:
+            body_path: 缓存文件路径
+
+        Returns:
+            行迭代器
+        """
+        with open(body_path, 'r', encoding='utf-8', newline='') as f:
+            yield from self._split_lines(iter(lambda: f.read(64 * 1024), ''))
+
+    @staticmethod
+    def _split_lines(chunks: Iterable[str]) -> Iterator[str]:
+        """
+        把文本块流按 '\n' 切分为行，结果与对完整文本调用 split('\n') 一致
+
+        Args:
+            chunks: 文本块迭代器
+
+        Returns:
+            行迭代器
+        """
+        pending = ''
+        for chunk in chunks:
+            if not chunk:
+                continue
+            lines = (pending + chunk).split('\n')
+            pending = lines.pop()
+            yield from lines
+        yield pending
+
+    @staticmethod
+    def _iter_stripped_lines(text: str) -> Iterator[str]:
+        """
+        逐行返回去掉首尾空白后的文本，结果与 text.strip().split('\n') 一致（空白文本不返回行）
+        只按下标切出每一行，不复制整段文本，也不构建行列表
+
+        Args:
+            text: 完整文本
+
+        Returns:
+            行迭代器
+        """
+        start, end = 0, len(text)
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+
+        find = text.find
+        while start < end:
+            line_end = find('\n', start, end)
+            if line_end < 0:
+                line_end = end
+            yield text[start:line_end]
+            start = line_end + 1
+
     def load_config(self, config_file: str) -> Dict:
         """
         加载配置文件
@@ -221,8 +644,13 @@ class SearXNGHostnamesGenerator:
             # 请求配置
             "request_config": {
                 "timeout": 30,
+                # 每个请求的总尝试次数，由 urllib3 Retry 重试连接错误与 429/5xx 状态码；
+                # 响应体读取中途断开时，完整下载的数据源额外重新请求一次
                 "retry_count": 3,
-                "retry_delay": 1
+                # 重试退避因子（指数退避）：第 n 次重试前等待约 retry_delay * 2^(n-1) 秒
+                "retry_delay": 1,
+                "max_workers": 16,     # 并发请求的最大线程数
+                "cache_dir": "./.cache/"  # HTTP 响应缓存目录，留空则禁用缓存
             },
 
             # 输出配置
@@ -243,7 +671,7 @@ class SearXNGHostnamesGenerator:
         if config_file:
             try:
                 with open(config_file, 'r', encoding='utf-8') as f:
-                    user_config = yaml.safe_load(f)
+                    user_config = yaml.load(f, Loader=YamlLoader)
                     # 深度合并配置
                     self._deep_merge(default_config, user_config)
             except FileNotFoundError:
@@ -277,35 +705,7 @@ class SearXNGHostnamesGenerator:
         if not url_string:
             return None
 
-        url_string = url_string.strip()
-
-        # 如果没有协议，尝试添加 http://
-        if not url_string.startswith(('http://', 'https://', 'ftp://')):
-            # 检查是否看起来像一个完整的域名
-            if '.' in url_string and not url_string.startswith('/'):
-                url_string = 'http://' + url_string
-            else:
-                return None
-
-        try:
-            parsed = urlparse(url_string)
-            hostname = parsed.netloc
-
-            if not hostname:
-                return None
-
-            # 移除端口号
-            if ':' in hostname:
-                hostname = hostname.split(':')[0]
-
-            # 验证域名格式
-            if self.is_valid_domain(hostname):
-                return hostname.lower()
-
-        except Exception as e:
-            print(f"  ❌ URL 解析失败: {url_string} - {e}")
-
-        return None
+        return _extract_hostname(url_string)
 
     def parse_csv_rule(self, csv_row: List[str], csv_config: Dict, row_num: int) -> Tuple[str, str]:
         """
@@ -387,75 +787,83 @@ class SearXNGHostnamesGenerator:
                 csv_reader = csv.reader(f, delimiter=delimiter)
 
                 headers = None
-                actual_column_index = None
+                actual_column_index = column_index
 
-                for row_num, row in enumerate(csv_reader, 1):
-                    if not row or all(cell.strip() == '' for cell in row):
-                        continue  # 跳过空行
+                # 第一遍：csv 模块的 C 解析器完成分词，整体过滤空行（所有单元格都为空白）
+                rows = [
+                    (row_num, row)
+                    for row_num, row in enumerate(csv_reader, 1)
+                    if ''.join(row).strip()
+                ]
 
+                # 处理头部行
+                if has_header and rows and rows[0][0] == 1:
                     stats['total_rules'] += 1
+                    headers = [cell.strip() for cell in rows[0][1]]
+                    rows = rows[1:]  # 跳过头部行，不解析数据
 
-                    # 处理头部行
-                    if has_header and row_num == 1:
-                        headers = [cell.strip() for cell in row]
-
-                        # 如果指定了列名，找到对应的索引
-                        if column:
-                            try:
-                                actual_column_index = headers.index(column)
-                                print(f"  📍 找到目标列 '{column}' 位于索引 {actual_column_index}")
-                            except ValueError:
-                                print(f"  ❌ 未找到指定的列名 '{column}'")
-                                print(f"  📋 可用的列名: {', '.join(headers)}")
-                                return domains, replace_rules, stats
-                        elif column_index is not None:
-                            actual_column_index = column_index
-                            if actual_column_index < len(headers):
-                                print(f"  📍 使用列索引 {actual_column_index}: '{headers[actual_column_index]}'")
-                            else:
-                                print(f"  ❌ 列索引 {actual_column_index} 超出范围")
-                                return domains, replace_rules, stats
-
-                        continue  # 跳过头部行，不解析数据
-
-                    # 如果没有设置实际列索引，使用配置的列索引
-                    if actual_column_index is None and column_index is not None:
-                        actual_column_index = column_index
-
-                    stats['csv_parsed_rows'] += 1
-
-                    try:
-                        # 解析 CSV 行
-                        if actual_column_index is not None:
-                            if actual_column_index < len(row):
-                                url_value = row[actual_column_index].strip()
-                                if url_value:
-                                    domain = self.extract_hostname_from_url(url_value)
-                                    if domain:
-                                        domains.add(domain)
-                                        stats['parsed_domains'] += 1
-                                        stats['csv_extracted_domains'] += 1
-
-                                        # 显示一些解析样本
-                                        if stats['csv_extracted_domains'] <= 5:
-                                            print(f"    ✅ CSV 解析: {url_value} -> {domain}")
-                                    else:
-                                        stats['csv_invalid_urls'] += 1
-                                        if stats['csv_invalid_urls'] <= 3:
-                                            print(f"    ❌ 无效 URL: {url_value}")
-                                else:
-                                    stats['invalid_domains'] += 1
-                            else:
-                                stats['invalid_domains'] += 1
-                                if stats['invalid_domains'] <= 3:
-                                    print(f"    ❌ 行 {row_num} 列索引超出范围")
+                    # 如果指定了列名，找到对应的索引
+                    if column:
+                        try:
+                            actual_column_index = headers.index(column)
+                            print(f"  📍 找到目标列 '{column}' 位于索引 {actual_column_index}")
+                        except ValueError:
+                            print(f"  ❌ 未找到指定的列名 '{column}'")
+                            print(f"  📋 可用的列名: {', '.join(headers)}")
+                            return domains, replace_rules, stats
+                    elif column_index is not None:
+                        if actual_column_index < len(headers):
+                            column_name = headers[actual_column_index]
+                            print(f"  📍 使用列索引 {actual_column_index}: '{column_name}'")
                         else:
-                            stats['invalid_domains'] += 1
-                            print(f"    ❌ 未设置有效的列索引")
+                            print(f"  ❌ 列索引 {actual_column_index} 超出范围")
+                            return domains, replace_rules, stats
+
+                stats['total_rules'] += len(rows)
+                stats['csv_parsed_rows'] += len(rows)
+
+                # 只读取目标列，收集待解析的 URL
+                url_values = []
+                if actual_column_index is None:
+                    if rows:
+                        stats['invalid_domains'] += len(rows)
+                        print(f"    ❌ 未设置有效的列索引")
+                else:
+                    values = [
+                        row[actual_column_index].strip()
+                        for _, row in rows if actual_column_index < len(row)
+                    ]
+                    url_values = list(filter(None, values))
+                    short_rows = [
+                        row_num for row_num, row in rows if actual_column_index >= len(row)
+                    ]
+                    stats['invalid_domains'] += len(values) - len(url_values) + len(short_rows)
+                    for row_num in short_rows[:3]:
+                        print(f"    ❌ 行 {row_num} 列索引超出范围")
+
+                # 第二遍：对整列批量提取 hostname（值已过滤为非空，直接调用模块级提取函数），整体并入域名集合
+                hostnames = list(map(_extract_hostname, url_values))
+                extracted = list(filter(None, hostnames))
+                domains.update(extracted)
+
+                # 显示一些解析样本，样本配额用完即停止扫描
+                valid_quota = 5 - stats['csv_extracted_domains']
+                invalid_quota = 3 - stats['csv_invalid_urls']
+                for url_value, domain in zip(url_values, hostnames):
+                    if valid_quota <= 0 and invalid_quota <= 0:
+                        break
+                    if domain:
+                        if valid_quota > 0:
+                            print(f"    ✅ CSV 解析: {url_value} -> {domain}")
+                        valid_quota -= 1
+                    else:
+                        if invalid_quota > 0:
+                            print(f"    ❌ 无效 URL: {url_value}")
+                        invalid_quota -= 1
 
-                    except Exception as e:
-                        print(f"    ❌ 解析第 {row_num} 行时出错: {e}")
-                        stats['invalid_domains'] += 1
+                stats['parsed_domains'] += len(extracted)
+                stats['csv_extracted_domains'] += len(extracted)
+                stats['csv_invalid_urls'] += len(hostnames) - len(extracted)
 
                 print(f"    ✅ CSV 解析完成: {stats['csv_extracted_domains']} 个有效域名")
                 if stats['csv_invalid_urls'] > 0:
@@ -497,38 +905,35 @@ class SearXNGHostnamesGenerator:
             if not rule:
                 return None, "仅包含注释"
 
-        # 检查是否是 v2ray 格式
-        if ':' not in rule:
+        # 一次匹配拆分 prefix:domain[:tag...]
+        match = _V2RAY_RULE_RE.match(rule)
+        if not match:
             return None, "非 v2ray 格式"
 
-        # 分离各部分：prefix:domain[:tag...]
-        parts = rule.split(':')
-        if len(parts) < 2:
-            return None, "无效的 v2ray 格式"
-
-        prefix = parts[0].strip().lower()
+        prefix_part, domain_part, tag_part = match.groups()
+        prefix = prefix_part.strip().lower()
 
         # 验证前缀
-        if prefix not in ['domain', 'full']:
+        if prefix not in ('domain', 'full'):
             return None, f"不支持的 v2ray 前缀: {prefix}"
 
         # 提取域名部分
-        domain_part = parts[1].strip()
+        domain_part = domain_part.strip()
 
         if not domain_part:
             return None, "域名部分为空"
 
         # 处理标签部分（如果存在）
-        tag_info = None
-        if len(parts) > 2:
-            tag_parts = parts[2:]
-            # 检查是否有标签
-            tags = [part.strip() for part in tag_parts if part.strip()]
+        if tag_part:
+            tags = [part.strip() for part in tag_part.split(':') if part.strip()]
             if tags:
                 tag_info = ':'.join(tags)
                 self.stats['v2ray_with_tags'] += 1
-                # 显示标签信息用于调试
-                print(f"    📝 v2ray 带标签: {original_rule} -> 域名: {domain_part}, 标签: {tag_info}")
+                # 只显示前几个标签样本，总数在解析结束后汇总输出
+                debug_count = getattr(self, '_debug_v2ray_tag_count', 0)
+                if debug_count < 3:
+                    print(f"    📝 v2ray 带标签: {original_rule} -> 域名: {domain_part}, 标签: {tag_info}")
+                    self._debug_v2ray_tag_count = debug_count + 1
 
         # 验证和清理域名（保持原始结构）
         cleaned_domain = self._clean_v2ray_domain(domain_part)
@@ -616,16 +1021,32 @@ class SearXNGHostnamesGenerator:
             print(f"  ✅ 加载了 {len(rules)} 个内置自动分类规则")
 
         # 从外部源加载规则
-        sources = auto_classify_config.get("sources", [])
-        for source in sources:
-            if not source.get("enabled", True):
-                continue
+        sources = [
+            source for source in auto_classify_config.get("sources", [])
+            if source.get("enabled", True)
+        ]
 
+        # 并发获取所有 URL 源，结果仍按配置顺序合并以保持规则优先级
+        url_futures = {}
+        url_sources = [source for source in sources if "url" in source]
+        if url_sources:
+            max_workers = min(
+                self.config["request_config"].get("max_workers", 16), len(url_sources)
+            )
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for source in url_sources:
+                    print(f"  🌐 正在从URL加载自动分类规则: {source['name']}")
+                    url_futures[id(source)] = executor.submit(
+                        self._load_auto_classify_from_url, source
+                    )
+
+        for source in sources:
             try:
                 if "url" in source:
                     # 从URL加载
-                    print(f"  🌐 正在从URL加载自动分类规则: {source['name']}")
-                    rules_from_url = self._load_auto_classify_from_url(source)
+                    rules_from_url, messages = url_futures[id(source)].result()
+                    for message in messages:
+                        print(message)
                     self.auto_classify_rules.extend(rules_from_url)
                 elif "file" in source:
                     # 从本地文件加载
@@ -638,25 +1059,94 @@ class SearXNGHostnamesGenerator:
         total_rules = len(self.auto_classify_rules)
         print(f"🔄 自动分类规则加载完成: {total_rules} 个规则")
 
+        self._index_auto_classify_rules()
+
         # 显示规则统计
         if total_rules > 0:
-            stats = defaultdict(int)
-            for rule in self.auto_classify_rules:
-                stats[rule['action']] += 1
+            stats = Counter(rule.action for rule in self.auto_classify_rules)
 
             print(f"  📊 规则分布:")
             for action, count in stats.items():
                 print(f"    - {action}: {count} 个")
 
-    def _parse_auto_classify_rule(self, rule_str: str) -> Dict:
+    def _index_auto_classify_rules(self) -> None:
+        """
+        为自动分类规则建立查找索引
+        精确规则按小写域名存入字典，通配符规则按去掉 "*." 后的域名存入字典（同一键保留最先出现的规则）。
+        每条记录带有规则序号，查找时取序号最小的匹配，与按顺序逐条匹配的结果一致；
+        另按相同的键保存全部规则列表，供 get_all_auto_classify_actions_for_domain 查找所有匹配；
+        替换规则直接转为正则表达式键，供 generate_rules 使用
+        """
+        self._skip_by_domain = {}
+        self._classify_by_domain = {}
+        self._skip_wildcards = {}
+        self._classify_wildcards = {}
+        self._replace_rules = {}
+        self._all_by_domain = defaultdict(list)
+        self._all_wildcards = defaultdict(list)
+
+        for index, rule in enumerate(self.auto_classify_rules):
+            action = rule.action
+            if action == 'replace':
+                self._replace_rules[self.domain_to_regex(rule.domain)] = rule.new_domain
+                continue
+
+            if action == 'skip':
+                exact_map, wildcards = self._skip_by_domain, self._skip_wildcards
+            else:
+                exact_map, wildcards = self._classify_by_domain, self._classify_wildcards
+
+            entry = (index, action, rule.domain)
+            rule_domain = rule.domain.lower()
+            if rule_domain.startswith('*.'):
+                wildcards.setdefault(rule_domain[2:], entry)
+                self._all_wildcards[rule_domain[2:]].append(entry)
+            else:
+                exact_map.setdefault(rule_domain, entry)
+                self._all_by_domain[rule_domain].append(entry)
+
+    def _match_auto_classify_index(
+        self, domain_lower: str, exact_map: Dict, wildcards: Dict
+    ) -> Tuple:
+        """
+        在索引中查找最先匹配的规则
+        通配符按域名后缀逐级查找（example.com、com ...），查找次数只与域名层级数有关
+
+        Args:
+            domain_lower: 小写域名
+            exact_map: 精确规则字典
+            wildcards: 通配符规则字典
+
+        Returns:
+            (序号, 动作, 规则域名)，无匹配时返回 None
+        """
+        best = exact_map.get(domain_lower)
+        if not wildcards:
+            return best
+
+        suffix = domain_lower
+        while True:
+            match = wildcards.get(suffix)
+            if match is not None and (best is None or match[0] < best[0]):
+                best = match
+
+            dot_pos = suffix.find('.')
+            if dot_pos < 0:
+                return best
+            suffix = suffix[dot_pos + 1:]
+
+    def _parse_auto_classify_rule(
+        self, rule_str: str, log: Callable[[str], None] = print
+    ) -> AutoClassifyRule:
         """
         解析自动分类规则
 
         Args:
             rule_str: 规则字符串，格式如 "action:domain" 或 "replace:old=new"
+            log: 状态信息输出函数
 
         Returns:
-            解析后的规则字典
+            解析后的规则
         """
         rule_str = rule_str.strip()
         if not rule_str or rule_str.startswith('#'):
@@ -676,58 +1166,45 @@ class SearXNGHostnamesGenerator:
         if action == 'replace':
             if '=' in content:
                 old_domain, new_domain = content.split('=', 1)
-                return {
-                    'action': 'replace',
-                    'old_domain': old_domain.strip(),
-                    'new_domain': new_domain.strip()
-                }
+                return AutoClassifyRule('replace', old_domain.strip(), new_domain.strip())
             else:
-                print(f"  ❌ 无效的替换规则格式: {rule_str} (应为 replace:old=new)")
+                log(f"  ❌ 无效的替换规则格式: {rule_str} (应为 replace:old=new)")
                 return None
 
         # 处理其他动作
         elif action in ['remove', 'low_priority', 'high_priority', 'skip']:
-            return {
-                'action': action,
-                'domain': content
-            }
+            return AutoClassifyRule(action, content)
         else:
-            print(f"  ❌ 未知的动作类型: {action}")
+            log(f"  ❌ 未知的动作类型: {action}")
             return None
 
-    def _load_auto_classify_from_url(self, source: dict) -> List[Dict]:
+    def _load_auto_classify_from_url(
+        self, source: dict
+    ) -> Tuple[List[AutoClassifyRule], List[str]]:
         """
-        从URL加载自动分类规则
+        从URL加载自动分类规则，在工作线程中调用
+        状态信息不直接输出，而是随结果返回，由调用方按配置顺序输出
 
         Args:
             source: 规则源配置
 
         Returns:
-            规则列表
+            (规则列表, 状态信息列表)
         """
         url = source["url"]
-        timeout = self.config["request_config"]["timeout"]
-        retry_count = self.config["request_config"]["retry_count"]
-        retry_delay = self.config["request_config"]["retry_delay"]
+        messages = []
 
-        for attempt in range(retry_count):
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                response = requests.get(url, timeout=timeout, headers=headers)
-                response.raise_for_status()
-
-                return self._parse_auto_classify_content(response.text)
+        # 重试由会话的 HTTPAdapter 负责
+        try:
+            lines = self._cached_get_lines(url, messages.append)
+            return self._parse_auto_classify_content(lines, messages.append), messages
 
-            except requests.RequestException as e:
-                print(f"    ❌ 获取失败 (尝试 {attempt + 1}/{retry_count}): {e}")
-                if attempt < retry_count - 1:
-                    time.sleep(retry_delay)
+        except requests.RequestException as e:
+            messages.append(f"    ❌ 获取失败 ({source['name']}): {e}")
 
-        return []
+        return [], messages
 
-    def _load_auto_classify_from_file(self, source: dict) -> List[Dict]:
+    def _load_auto_classify_from_file(self, source: dict) -> List[AutoClassifyRule]:
         """
         从本地文件加载自动分类规则
 
@@ -740,8 +1217,7 @@ class SearXNGHostnamesGenerator:
         file_path = source["file"]
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return self._parse_auto_classify_content(content)
+                return self._parse_auto_classify_content(f)
         except FileNotFoundError:
             print(f"    ❌ 文件不存在: {file_path}")
         except Exception as e:
@@ -749,23 +1225,25 @@ class SearXNGHostnamesGenerator:
 
         return []
 
-    def _parse_auto_classify_content(self, content: str) -> List[Dict]:
+    def _parse_auto_classify_content(self, lines: Iterable[str],
+                                     log: Callable[[str], None] = print) -> List[AutoClassifyRule]:
         """
         解析自动分类规则内容
 
         Args:
-            content: 文件内容
+            lines: 规则行的可迭代对象（文件对象或流式响应行）
+            log: 状态信息输出函数
 
         Returns:
             规则列表
         """
         rules = []
-        for line in content.strip().split('\n'):
+        for line in lines:
             line = line.strip()
             if not line or line.startswith('#'):
                 continue
 
-            parsed_rule = self._parse_auto_classify_rule(line)
+            parsed_rule = self._parse_auto_classify_rule(line, log)
             if parsed_rule:
                 rules.append(parsed_rule)
 
@@ -812,12 +1290,35 @@ class SearXNGHostnamesGenerator:
                 content = f.read()
 
             print(f"  📁 正在解析文件: {file_path} (格式: {format_type})")
-
-            for line_num, line in enumerate(content.strip().split('\n'), 1):
-                line = line.strip()
-                if not line:
-                    continue
-
+            self._debug_v2ray_tag_count = 0
+
+            # 正则引擎一次扫描整个文件，直接得到去除空白后的非空行
+            lines = _LINE_RE.findall(content)
+            numbered_lines = enumerate(lines, 1)
+
+            parsing_config = self.config["parsing"]
+            if format_type not in ("replace", "regex", "ublock", "v2ray") and (
+                    parsing_config.get("preserve_original_structure", True)
+                    or parsing_config.get("preserve_www_prefix", True)):
+                # 🚀 批量处理：已是规范域名的行（绝大多数）整体用正则掩码筛出，
+                # clean_domain 对它们只会返回小写形式；其余行再逐行处理
+                mask = list(map(_DOMAIN_RE.match, lines))
+                matched = list(compress(lines, mask))
+                ip_count = 0
+                if parsing_config["ignore_ip"]:
+                    ip_lines = list(filter(_IPV4_RE.match, matched))
+                    if ip_lines:
+                        ip_count = len(ip_lines)
+                        matched = list(compress(matched, map(not_, map(_IPV4_RE.match, matched))))
+
+                domains.update(map(str.lower, matched))
+                stats['total_rules'] += len(matched) + ip_count
+                stats['parsed_domains'] += len(matched)
+                stats['invalid_domains'] += ip_count
+
+                numbered_lines = compress(numbered_lines, map(not_, mask))
+
+            for line_num, line in numbered_lines:
                 stats['total_rules'] += 1
 
                 # 跳过注释
@@ -885,11 +1386,11 @@ class SearXNGHostnamesGenerator:
                             stats['invalid_domains'] += 1
 
                 except Exception as e:
-                    print(f"    ❌ 解析第 {line_num} 行时出错: {line[:50]}... - {e}")
+                    print(f"    ❌ 解析第 {line_num} 条规则时出错: {line[:50]}... - {e}")
                     stats['invalid_domains'] += 1
 
             # 累加 v2ray 标签统计
-            stats['v2ray_with_tags'] = self.stats.get('v2ray_with_tags', 0)
+            stats['v2ray_with_tags'] = self.stats['v2ray_with_tags']
 
             print(f"    ✅ 解析完成: {stats['parsed_domains']} 个有效规则")
             if format_type == "v2ray" and stats['v2ray_with_tags'] > 0:
@@ -916,24 +1417,15 @@ class SearXNGHostnamesGenerator:
         Returns:
             (是否跳过, 跳过原因)
         """
-        if not self.auto_classify_rules:
+        # 没有任何 skip 规则时无需查找
+        if not self._skip_by_domain and not self._skip_wildcards:
             return False, ""
 
-        domain_lower = domain.lower()
-
-        for rule in self.auto_classify_rules:
-            if rule['action'] == 'skip':
-                rule_domain = rule['domain'].lower()
-
-                # 支持通配符匹配
-                if rule_domain.startswith('*.'):
-                    # 通配符匹配子域名
-                    pattern_domain = rule_domain[2:]  # 移除 *.
-                    if domain_lower == pattern_domain or domain_lower.endswith('.' + pattern_domain):
-                        return True, f"自动分类跳过规则: {rule['domain']} (仅影响数据源处理)"
-                elif domain_lower == rule_domain:
-                    # 精确匹配
-                    return True, f"自动分类跳过规则: {rule['domain']} (仅影响数据源处理)"
+        match = self._match_auto_classify_index(
+            domain.lower(), self._skip_by_domain, self._skip_wildcards
+        )
+        if match:
+            return True, f"自动分类跳过规则: {match[2]} (仅影响数据源处理)"
 
         return False, ""
 
@@ -947,24 +1439,15 @@ class SearXNGHostnamesGenerator:
         Returns:
             (动作类型, 匹配原因)
         """
-        if not self.auto_classify_rules:
+        # 没有任何分类规则时无需查找
+        if not self._classify_by_domain and not self._classify_wildcards:
             return None, ""
 
-        domain_lower = domain.lower()
-
-        for rule in self.auto_classify_rules:
-            if rule['action'] in ['remove', 'low_priority', 'high_priority']:
-                rule_domain = rule['domain'].lower()
-
-                # 支持通配符匹配
-                if rule_domain.startswith('*.'):
-                    # 通配符匹配子域名
-                    pattern_domain = rule_domain[2:]  # 移除 *.
-                    if domain_lower == pattern_domain or domain_lower.endswith('.' + pattern_domain):
-                        return rule['action'], f"自动分类规则: {rule['domain']}"
-                elif domain_lower == rule_domain:
-                    # 精确匹配
-                    return rule['action'], f"自动分类规则: {rule['domain']}"
+        match = self._match_auto_classify_index(
+            domain.lower(), self._classify_by_domain, self._classify_wildcards
+        )
+        if match:
+            return match[1], f"自动分类规则: {match[2]}"
 
         return None, ""
 
@@ -982,23 +1465,21 @@ class SearXNGHostnamesGenerator:
             return []
 
         domain_lower = domain.lower()
-        actions = []
-
-        for rule in self.auto_classify_rules:
-            if rule['action'] in ['remove', 'low_priority', 'high_priority', 'skip']:
-                rule_domain = rule['domain'].lower()
-
-                # 支持通配符匹配
-                if rule_domain.startswith('*.'):
-                    # 通配符匹配子域名
-                    pattern_domain = rule_domain[2:]  # 移除 *.
-                    if domain_lower == pattern_domain or domain_lower.endswith('.' + pattern_domain):
-                        actions.append((rule['action'], f"自动分类规则: {rule['domain']}"))
-                elif domain_lower == rule_domain:
-                    # 精确匹配
-                    actions.append((rule['action'], f"自动分类规则: {rule['domain']}"))
-
-        return actions
+        matches = list(self._all_by_domain.get(domain_lower, ()))
+
+        # 通配符按域名后缀逐级查找（example.com、com ...）
+        if self._all_wildcards:
+            suffix = domain_lower
+            while True:
+                matches.extend(self._all_wildcards.get(suffix, ()))
+                dot_pos = suffix.find('.')
+                if dot_pos < 0:
+                    break
+                suffix = suffix[dot_pos + 1:]
+
+        # 按规则出现顺序返回
+        matches.sort()
+        return [(action, f"自动分类规则: {rule_domain}") for _, action, rule_domain in matches]
 
     def apply_auto_classify_rules_directly(self, categorized_domains: Dict[str, Set[str]]) -> None:
         """
@@ -1019,17 +1500,20 @@ class SearXNGHostnamesGenerator:
         skip_overridden_count = 0
         skip_overridden_samples = []
 
-        # 收集所有已存在的域名（用于跳过重复）
-        all_existing_domains = set()
-        for domain_set in categorized_domains.values():
-            all_existing_domains.update(d.lower() for d in domain_set)
+        # 已存在的域名（用于跳过重复）直接在各类别集合中查找，不再复制一份小写集合：
+        # 解析得到的域名均已小写，只为少数含大写字符的条目（如自定义正则规则）另存小写形式
+        existing_sets = list(categorized_domains.values())
+        mixed_case_domains = {
+            d.lower() for domain_set in existing_sets for d in domain_set if not d.islower()
+        }
 
-        # 按域名分组处理所有规则，以便处理冲突
-        domain_rules_map = defaultdict(list)
+        # 按域名单遍归并所有规则，以便处理冲突：
+        # 域名 -> (最后一条非 skip 规则的动作，是否存在 skip 规则)
+        domain_rules_map = {}
 
         for rule in self.auto_classify_rules:
-            if rule['action'] in ['remove', 'low_priority', 'high_priority', 'skip']:
-                domain = rule['domain']
+            if rule.action in ['remove', 'low_priority', 'high_priority', 'skip']:
+                domain = rule.domain
 
                 # 处理通配符域名
                 if domain.startswith('*.'):
@@ -1041,17 +1525,23 @@ class SearXNGHostnamesGenerator:
                 if not cleaned_domain:
                     continue
 
-                domain_rules_map[cleaned_domain].append(rule)
+                effective_action, has_skip = domain_rules_map.get(cleaned_domain, (None, False))
+                if rule.action == 'skip':
+                    has_skip = True
+                else:
+                    # 如果有多个非 skip 规则，取最后一个
+                    effective_action = rule.action
+                domain_rules_map[cleaned_domain] = (effective_action, has_skip)
 
-            elif rule['action'] == 'replace':
+            elif rule.action == 'replace':
                 # 处理替换规则
-                old_domain = rule['old_domain']
-                new_domain = rule['new_domain']
+                old_domain = rule.domain
+                new_domain = rule.new_domain
 
                 cleaned_old_domain = self.clean_domain_preserve_structure(old_domain)
                 if cleaned_old_domain and new_domain:
                     # 生成正则表达式格式的键
-                    old_regex = f"(.*\\.)?{re.escape(cleaned_old_domain)}$"
+                    old_regex = self.domain_to_regex(cleaned_old_domain)
                     self.config["replace_rules"][old_regex] = new_domain
                     auto_added_count += 1
 
@@ -1059,24 +1549,16 @@ class SearXNGHostnamesGenerator:
                         auto_added_samples.append(f"{cleaned_old_domain} -> {new_domain} (替换)")
 
         # 处理每个域名的规则
-        for domain, rules in domain_rules_map.items():
-            # 检查是否已存在
-            if domain.lower() in all_existing_domains:
+        for domain, (action, has_skip) in domain_rules_map.items():
+            # 检查是否已存在（domain 已由 clean_domain_preserve_structure 转为小写）
+            if (domain in mixed_case_domains
+                    or any(domain in domain_set for domain_set in existing_sets)):
                 continue
 
-            # 分析规则优先级
-            has_skip = any(r['action'] == 'skip' for r in rules)
-            non_skip_rules = [r for r in rules if r['action'] != 'skip']
-
-            if non_skip_rules:
+            if action:
                 # 有非 skip 的规则，优先处理这些规则
-                # 如果有多个非 skip 规则，取最后一个（或者可以根据优先级排序）
-                effective_rule = non_skip_rules[-1]  # 取最后一个规则
-
-                action = effective_rule['action']
                 if action in categorized_domains:
                     categorized_domains[action].add(domain)
-                    all_existing_domains.add(domain.lower())
                     auto_added_count += 1
 
                     if len(auto_added_samples) < 5:
@@ -1176,17 +1658,11 @@ class SearXNGHostnamesGenerator:
         else:
             url_part = url_string
 
-        # 检查是否有路径部分
-        if '/' in url_part:
-            domain_and_path = url_part.split('/', 1)
-            if len(domain_and_path) > 1:
-                path_part = domain_and_path[1]
-
-                # 简化逻辑：只要路径部分不为空且不是单独的'*'，就认为是特定路径
-                if path_part and path_part != '*':
-                    return True
+        # 检查是否有路径部分（只在第一个 '/' 处切分一次）
+        path_part = url_part.partition('/')[2]
 
-        return False
+        # 简化逻辑：只要路径部分不为空且不是单独的'*'，就认为是特定路径
+        return bool(path_part) and path_part != '*'
 
     def extract_domain_from_rule(self, rule: str) -> str:
         """
@@ -1200,36 +1676,13 @@ class SearXNGHostnamesGenerator:
         """
         rule = rule.strip()
 
-        # 🔄 修复：对于特定路径规则，仍然尝试提取域名
-        # 首先检查是否包含具体路径
-        has_specific_path = self._has_specific_path(rule)
-
-        # 🔧 新增：支持更多的uBlock规则格式
-        patterns = [
-            # 🔧 新增：*.domain.com/* 格式 (通配符域名)
-            r'^\*\.([a-zA-Z0-9.-]+)(?:/.*)?(?:\*)?$',
-            # 🔧 新增：*.domain.com/path/* 格式
-            r'^\*\.([a-zA-Z0-9.-]+)/.*(?:\*)?$',
-            # 原有：*://*.domain.com/* 或 *://*.domain.com (通配符子域名)
-            r'^\*://\*\.([a-zA-Z0-9.-]+)(?:/.*)?$',
-            # 原有：*://domain.com/* 或 *://domain.com (无通配符)
-            r'^\*://([a-zA-Z0-9.-]+)(?:/.*)?$',
-            # 🔧 新增：https://domain.com/* 格式
-            r'^https?://([a-zA-Z0-9.-]+)(?:/.*)?$',
-            # 原有：||domain.com^ 或 ||domain.com/path
-            r'^\|\|([a-zA-Z0-9.-]+)(?:/.*)?(?:\^)?$',
-            # 🔧 新增：domain.com/* 格式
-            r'^([a-zA-Z0-9.-]+)/.*(?:\*)?$',
-            # 原有：普通域名格式
-            r'^([a-zA-Z0-9.-]+)(?:/.*)?$',
-            # 🔧 修复：domain.com* 格式（不带斜杠的通配符）
-            r'^([a-zA-Z0-9.-]+)\*$',
-        ]
-
-        for pattern in patterns:
-            match = re.match(pattern, rule)
-            if match:
-                candidate = match.group(1)
+        # 🔄 修复：对于特定路径规则，仍然尝试提取域名（是否为特定路径由调用方判断）
+        # 合并正则一次匹配给出第一个命中的格式；其候选域名无效时按原顺序继续尝试之后的格式
+        match = _UBLOCK_RULE_RE.match(rule)
+        if match:
+            index = match.lastindex
+            candidate = match.group(index)
+            while True:
                 # 验证提取的候选域名
                 if candidate and '.' in candidate and not candidate.startswith('/'):
                     # 🔧 进一步验证域名格式
@@ -1242,14 +1695,23 @@ class SearXNGHostnamesGenerator:
                             print(f"  🔧 域名格式验证失败: {rule} -> {candidate}")
                             self._debug_extract_count = debug_count + 1
 
+                match = None
+                while match is None and index < len(_UBLOCK_RULE_PATTERNS):
+                    match = _UBLOCK_RULE_PATTERNS[index].match(rule)
+                    index += 1
+                if match is None:
+                    break
+                candidate = match.group(1)
+
         # 🔄 对于 *://*/filename 这种格式，我们无法提取有效域名，返回 None
         if rule.startswith('*://*/'):
             return None
 
         # 🔧 增强的通用域名提取（最后的后备方案）
         # 尝试提取所有可能的域名格式
-        domain_candidates = re.findall(r'([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', rule)
-        for candidate in domain_candidates:
+        # 逐个取出候选，遇到第一个有效域名即停止扫描
+        for candidate_match in _DOMAIN_FALLBACK_RE.finditer(rule):
+            candidate = candidate_match.group(1)
             if self.is_valid_domain(candidate):
                 return candidate
 
@@ -1267,14 +1729,13 @@ class SearXNGHostnamesGenerator:
         """
         original_rule = rule  # 保存原始规则用于调试
         rule = rule.strip()
-        if not rule or rule.startswith('!') or rule.startswith('#'):
+        if not rule or rule.startswith(('!', '#')):
             return None, "注释或空行", False
 
-        # 处理行末注释 - 移除 # 后面的所有内容
-        if '#' in rule:
-            # 找到第一个 # 的位置，移除它及后面的内容
-            comment_pos = rule.find('#')
-            rule = rule[:comment_pos].strip()
+        # 处理行末注释 - 在第一个 # 处切分一次，移除它及后面的内容
+        rule, comment_sep, _ = rule.partition('#')
+        if comment_sep:
+            rule = rule.strip()
 
             # 如果移除注释后规则为空，则忽略
             if not rule:
@@ -1379,263 +1840,436 @@ class SearXNGHostnamesGenerator:
             'wildcard_rules_processed': 0,  # 🔧 处理的通配符规则数量
         }
 
-        retry_count = self.config["request_config"]["retry_count"]
-        timeout = self.config["request_config"]["timeout"]
-        retry_delay = self.config["request_config"]["retry_delay"]
+        print(f"正在获取 {url} - 格式: {format_type}")
+
+        # 重试由会话的 HTTPAdapter 负责；collect_domains 已预取时直接等待预取结果
+        prefetched = self._prefetched_content.pop(url, None)
+        content, messages, error = prefetched.result() if prefetched else self._download_source(url)
+        for message in messages:
+            print(message)
+        if error:
+            print(f"获取失败: {error}")
+            print(f"放弃获取 {url}")
+            return domains, {}, stats
+
+        # CSV 格式特殊处理
+        if format_type == "csv":
+            if not csv_config:
+                print(f"  ❌ CSV 格式需要 csv_config 配置")
+                return domains, path_domains_classified, stats
+
+            return self._parse_csv_from_response(content, csv_config, source_name, stats)
+
+        # 记录一些被忽略的规则用于调试
+        ignored_samples = []
+        accepted_samples = []
+        comment_samples = []
+        path_samples = []  # 路径规则样本
+        skip_samples = []  # 跳过的域名样本
+        path_to_low_priority_samples = []  # 特定路径转低优先级样本
+        path_kept_action_samples = []      # 🔧 特定路径保持动作样本
+
+        # 重置 v2ray 标签计数器
+        initial_v2ray_tags = self.stats['v2ray_with_tags']
+
+        # 重置调试计数器
+        self._debug_path_count = 0
+        self._debug_success_count = 0
+        self._debug_fail_count = 0
+        self._debug_extract_count = 0
+        self._debug_v2ray_tag_count = 0
+
+        # 🔧 获取源动作和特定路径处理配置
+        source_action = getattr(self, '_current_source_action', 'remove')  # 临时存储当前源动作
+        specific_path_action = self.config["parsing"].get("specific_path_action", "keep_action")
+
+        print(f"  🔧 特定路径处理模式: {specific_path_action}")
+        print(f"  🔧 源动作: {source_action}")
+
+        # 💾 内容与解析配置均未变化时直接复用上次的解析结果
+        parsed_cache_path = self._parsed_cache_path(url, format_type, source_name)
+        parsed_cache_key = self._parsed_cache_key(
+            source_action, specific_path_action, self._hash_text(content)
+        )
+        cached = self._load_parsed_cache(parsed_cache_path, parsed_cache_key)
+        if cached is not None:
+            domains, path_domains_classified, stats, stats_deltas = cached
+            # 重放解析过程中对全局统计的累加
+            for key, delta in stats_deltas.items():
+                self.stats[key] += delta
+            stats['wildcard_rules_processed'] = self.stats['wildcard_rules_processed']
+
+            total_path_domains = sum(
+                len(domain_set) for domain_set in path_domains_classified.values()
+            )
+            print(f"  💾 内容未变化，复用解析缓存（跳过逐条解析，不输出解析样本与诊断信息）")
+            print(f"成功获取 {len(domains)} 个普通域名，{total_path_domains} 个特定路径域名")
+            return domains, path_domains_classified, stats
+
+        initial_wildcard_rules = self.stats['wildcard_rules_processed']
+
+        # 普通域名格式的快速路径：不会移除 www. 前缀时，通过域名正则的行无需再走通用提取流程
+        ignore_ip = self.config["parsing"]["ignore_ip"]
+        plain_domain_fast_path = format_type not in ("ublock", "v2ray") and (
+            self.config["parsing"].get("preserve_original_structure", True)
+            or self.config["parsing"].get("preserve_www_prefix", True))
+
+        # 循环中频繁调用的方法绑定为局部变量，省去每行的属性查找
+        parse_ublock_rule = self.parse_ublock_rule
+        parse_v2ray_rule = self.parse_v2ray_rule
+        should_skip_domain = self.should_skip_domain_from_source
+        clean_domain = self.clean_domain
+        extract_domain_from_rule = self.extract_domain_from_rule
+        add_domain = domains.add
+
+        # 源动作与特定路径处理模式在整个数据源内不变，特定路径规则的最终动作只需确定一次
+        path_rule_action = self.determine_path_rule_action(source_action, specific_path_action)
+
+        # 解析域名：逐个匹配非空行，不再生成整份内容的行列表和逐行 strip 副本
+        for line_num, line_match in enumerate(_LINE_RE.finditer(content), 1):
+            line = line_match.group(1)
+            stats['total_rules'] += 1
 
-        for attempt in range(retry_count):
             try:
-                print(f"正在获取 {url} (尝试 {attempt + 1}/{retry_count}) - 格式: {format_type}")
+                if format_type == "ublock":
+                    # 🔧 修复：使用新的 parse_ublock_rule 方法
+                    domain, ignore_reason, is_path_rule = parse_ublock_rule(line)
+
+                    if domain:
+                        # 检查是否应该从数据源跳过此域名
+                        should_skip, skip_reason = should_skip_domain(domain, source_name)
+                        if should_skip:
+                            stats['skipped_domains'] += 1
+                            if len(skip_samples) < 3:
+                                skip_samples.append(f"{line} -> {domain} ({skip_reason})")
+                        else:
+                            # 🔧 修复：根据是否是特定路径规则和配置决定如何处理
+                            if is_path_rule:
+                                # 特定路径规则的最终动作（循环前已确定）
+                                final_action = path_rule_action
 
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
+                                if final_action is None:
+                                    # 忽略这个域名
+                                    stats['ignored_with_path'] += 1
+                                    if len(path_samples) < 3:
+                                        path_samples.append(f"{line} -> {domain} (忽略)")
+                                elif final_action == "low_priority":
+                                    # 初始化分类字典
+                                    if final_action not in path_domains_classified:
+                                        path_domains_classified[final_action] = set()
+                                    path_domains_classified[final_action].add(domain)
+                                    stats['path_to_low_priority'] += 1
+                                    if len(path_to_low_priority_samples) < 5:
+                                        path_to_low_priority_samples.append(
+                                            f"{line} -> {domain} (路径规则->低优先级)"
+                                        )
+                                else:
+                                    # 保持原动作或其他动作
+                                    if final_action not in path_domains_classified:
+                                        path_domains_classified[final_action] = set()
+                                    path_domains_classified[final_action].add(domain)
+                                    stats['path_kept_action'] += 1
+                                    if len(path_kept_action_samples) < 5:
+                                        path_kept_action_samples.append(
+                                            f"{line} -> {domain} (路径规则->{final_action})"
+                                        )
+                            else:
+                                # 普通域名规则
+                                if domain in domains:
+                                    stats['duplicate_domains'] += 1
+                                else:
+                                    add_domain(domain)
+                                    stats['parsed_domains'] += 1
+                                    if len(accepted_samples) < 3:
+                                        accepted_samples.append(f"{line} -> {domain}")
+                    else:
+                        # 统计忽略原因
+                        if "特定路径" in (ignore_reason or ""):
+                            stats['ignored_with_path'] += 1
+                            if len(path_samples) < 3:
+                                path_samples.append(line)
+                        elif ignore_reason in ["注释或空行", "仅包含注释"]:
+                            stats['ignored_comments'] += 1
+                            if len(comment_samples) < 3:
+                                comment_samples.append(line)
+                        else:
+                            stats['invalid_domains'] += 1
+                            if len(ignored_samples) < 3:
+                                ignored_samples.append(line)
+
+                elif format_type == "v2ray":
+                    # 使用 v2ray 语法解析
+                    domain, ignore_reason = parse_v2ray_rule(line)
+                    if domain and len(accepted_samples) < 3:
+                        accepted_samples.append(f"v2ray: {line} -> {domain}")
+                    elif ignore_reason and len(ignored_samples) < 3:
+                        ignored_samples.append(f"v2ray: {line} ({ignore_reason})")
+
+                    if domain:
+                        # 检查是否应该从数据源跳过此域名
+                        should_skip, skip_reason = should_skip_domain(domain, source_name)
+                        if should_skip:
+                            stats['skipped_domains'] += 1
+                            if len(skip_samples) < 3:
+                                skip_samples.append(f"{line} -> {domain} ({skip_reason})")
+                        else:
+                            if domain in domains:
+                                stats['duplicate_domains'] += 1
+                            else:
+                                add_domain(domain)
+                                stats['parsed_domains'] += 1
+                    else:
+                        # 统计忽略原因
+                        if ignore_reason in ["注释或空行", "仅包含注释"]:
+                            stats['ignored_comments'] += 1
+                            if len(comment_samples) < 3:
+                                comment_samples.append(line)
+                        elif ignore_reason == "无效域名":
+                            stats['invalid_domains'] += 1
+                            if len(ignored_samples) < 3:
+                                ignored_samples.append(line)
 
-                response = requests.get(url, timeout=timeout, headers=headers)
-                response.raise_for_status()
+                else:
+                    # 普通域名格式 - 也需要处理行末注释
+                    cleaned_line = line
+                    if '#' in line:
+                        cleaned_line = line[:line.find('#')].strip()
+                        if not cleaned_line:
+                            stats['ignored_comments'] += 1
+                            if len(comment_samples) < 3:
+                                comment_samples.append(line)
+                            continue
+
+                    if plain_domain_fast_path and _DOMAIN_RE.match(cleaned_line) and not (
+                            ignore_ip and _IPV4_RE.match(cleaned_line)):
+                        # 已是规范域名：提取与清理只会返回其小写形式
+                        domain = cleaned_line.lower()
+                    else:
+                        domain = clean_domain(extract_domain_from_rule(cleaned_line))
+                    if domain:
+                        # 检查是否应该从数据源跳过此域名
+                        should_skip, skip_reason = should_skip_domain(domain, source_name)
+                        if should_skip:
+                            stats['skipped_domains'] += 1
+                            if len(skip_samples) < 3:
+                                skip_samples.append(f"{line} -> {domain} ({skip_reason})")
+                        else:
+                            if domain in domains:
+                                stats['duplicate_domains'] += 1
+                            else:
+                                add_domain(domain)
+                                stats['parsed_domains'] += 1
+                                if len(accepted_samples) < 3:
+                                    accepted_samples.append(f"{line} -> {domain}")
+                    else:
+                        stats['invalid_domains'] += 1
+                        if len(ignored_samples) < 3:
+                            ignored_samples.append(line)
 
-                # CSV 格式特殊处理
-                if format_type == "csv":
-                    if not csv_config:
-                        print(f"  ❌ CSV 格式需要 csv_config 配置")
-                        return domains, path_domains_classified, stats
+            except Exception as e:
+                print(f"解析第 {line_num} 条规则时出错: {line[:50]}... - {e}")
+                stats['invalid_domains'] += 1
+                continue
 
-                    return self._parse_csv_from_response(response.text, csv_config, source_name, stats)
+        # 计算本次请求中的 v2ray 标签数量和通配符规则数量
+        current_v2ray_tags = self.stats['v2ray_with_tags'] - initial_v2ray_tags
+        stats['v2ray_with_tags'] = current_v2ray_tags
+        stats['wildcard_rules_processed'] = self.stats['wildcard_rules_processed']
+
+        self._save_parsed_cache(parsed_cache_path, parsed_cache_key, (
+            domains, path_domains_classified, stats, {
+                'v2ray_with_tags': current_v2ray_tags,
+                'wildcard_rules_processed': (
+                    stats['wildcard_rules_processed'] - initial_wildcard_rules
+                ),
+            }
+        ))
+
+        # 计算特定路径域名总数
+        total_path_domains = sum(len(domain_set) for domain_set in path_domains_classified.values())
+
+        print(f"成功获取 {len(domains)} 个普通域名，{total_path_domains} 个特定路径域名")
+        print(f"  - 总规则: {stats['total_rules']}")
+        print(f"  - 成功解析: {stats['parsed_domains']}")
+        print(f"  - 忽略(特定路径): {stats['ignored_with_path']}")
+        print(f"  - 🔧 特定路径->低优先级: {stats['path_to_low_priority']}")
+        print(f"  - 🔧 特定路径保持原动作: {stats['path_kept_action']}")
+        print(f"  - 忽略(注释): {stats['ignored_comments']}")
+        print(f"  - 忽略(无效域名): {stats['invalid_domains']}")
+        print(f"  - 重复域名: {stats['duplicate_domains']}")
+        print(f"  - 跳过域名: {stats['skipped_domains']}")
+        if format_type == "v2ray" and stats['v2ray_with_tags'] > 0:
+            print(f"  - v2ray 带标签规则: {stats['v2ray_with_tags']}")
+        if stats['wildcard_rules_processed'] > 0:
+            print(f"  - 🔧 通配符规则处理: {stats['wildcard_rules_processed']}")
+
+        # 显示样本
+        if accepted_samples:
+            print(f"  - 接受的规则样本:")
+            for sample in accepted_samples:
+                print(f"    ✓ {sample}")
+
+        if path_to_low_priority_samples:
+            print(f"  - 🔧 特定路径->低优先级样本:")
+            for sample in path_to_low_priority_samples:
+                print(f"    📍 {sample}")
+
+        if path_kept_action_samples:
+            print(f"  - 🔧 特定路径保持动作样本:")
+            for sample in path_kept_action_samples:
+                print(f"    🎯 {sample}")
+
+        if skip_samples:
+            print(f"  - 跳过的域名样本:")
+            for sample in skip_samples:
+                print(f"    ⏭️ {sample}")
+
+        if path_samples:
+            print(f"  - 忽略的路径规则样本:")
+            for sample in path_samples:
+                print(f"    🛤️  {sample}")
+
+        if comment_samples:
+            print(f"  - 忽略的注释规则样本:")
+            for sample in comment_samples:
+                print(f"    # {sample}")
+
+        if ignored_samples:
+            print(f"  - 其他忽略的规则样本:")
+            for sample in ignored_samples:
+                print(f"    ✗ {sample}")
+
+        return domains, path_domains_classified, stats
+
+    @staticmethod
+    def _hash_text(text: str) -> str:
+        """
+        分块计算文本的 SHA-1，避免一次性编码出整份内容的 bytes 副本
 
-                # 记录一些被忽略的规则用于调试
-                ignored_samples = []
-                accepted_samples = []
-                comment_samples = []
-                path_samples = []  # 路径规则样本
-                skip_samples = []  # 跳过的域名样本
-                path_to_low_priority_samples = []  # 特定路径转低优先级样本
-                path_kept_action_samples = []      # 🔧 特定路径保持动作样本
+        Args:
+            text: 文本内容
 
-                # 重置 v2ray 标签计数器
-                initial_v2ray_tags = self.stats.get('v2ray_with_tags', 0)
+        Returns:
+            十六进制哈希值
+        """
+        digest = hashlib.sha1()
+        chunk_size = 1 << 20
+        for start in range(0, len(text), chunk_size):
+            digest.update(text[start:start + chunk_size].encode('utf-8'))
+        return digest.hexdigest()
 
-                # 重置调试计数器
-                self._debug_path_count = 0
-                self._debug_success_count = 0
-                self._debug_fail_count = 0
-                self._debug_extract_count = 0
+    def _parsed_cache_path(self, url: str, format_type: str, source_name: str) -> Union[str, None]:
+        """
+        计算解析结果缓存文件路径
+        每个数据源只对应一个缓存文件，配置或脚本变化后新结果直接覆盖旧文件，缓存不会累积
 
-                # 🔧 获取源动作和特定路径处理配置
-                source_action = getattr(self, '_current_source_action', 'remove')  # 临时存储当前源动作
-                specific_path_action = self.config["parsing"].get("specific_path_action", "keep_action")
+        Args:
+            url: 数据源地址
+            format_type: 格式类型
+            source_name: 数据源名称
 
-                print(f"  🔧 特定路径处理模式: {specific_path_action}")
-                print(f"  🔧 源动作: {source_action}")
+        Returns:
+            缓存文件路径，未配置缓存目录时返回 None
+        """
+        cache_dir = self.config["request_config"].get("cache_dir")
+        if not cache_dir:
+            return None
 
-                # 解析域名
-                for line_num, line in enumerate(response.text.strip().split('\n'), 1):
-                    line = line.strip()
-                    if not line:
-                        continue
+        key = json.dumps([url, format_type, source_name])
+        file_name = hashlib.sha1(key.encode('utf-8')).hexdigest() + '.parsed.json'
+        return os.path.join(cache_dir, file_name)
 
-                    stats['total_rules'] += 1
+    def _parsed_cache_key(
+        self, source_action: str, specific_path_action: str, content_hash: str
+    ) -> str:
+        """
+        计算解析结果缓存的校验键
+        由内容哈希与所有影响解析结果的配置（解析选项、自动分类规则、脚本本身）共同决定
 
-                    try:
-                        if format_type == "ublock":
-                            # 🔧 修复：使用新的 parse_ublock_rule 方法
-                            domain, ignore_reason, is_path_rule = self.parse_ublock_rule(line)
-
-                            if domain:
-                                # 检查是否应该从数据源跳过此域名
-                                should_skip, skip_reason = self.should_skip_domain_from_source(domain, source_name)
-                                if should_skip:
-                                    stats['skipped_domains'] += 1
-                                    if len(skip_samples) < 3:
-                                        skip_samples.append(f"{line} -> {domain} ({skip_reason})")
-                                else:
-                                    # 🔧 修复：根据是否是特定路径规则和配置决定如何处理
-                                    if is_path_rule:
-                                        # 确定特定路径规则的最终动作
-                                        final_action = self.determine_path_rule_action(source_action, specific_path_action)
-
-                                        if final_action is None:
-                                            # 忽略这个域名
-                                            stats['ignored_with_path'] += 1
-                                            if len(path_samples) < 3:
-                                                path_samples.append(f"{line} -> {domain} (忽略)")
-                                        elif final_action == "low_priority":
-                                            # 初始化分类字典
-                                            if final_action not in path_domains_classified:
-                                                path_domains_classified[final_action] = set()
-                                            path_domains_classified[final_action].add(domain)
-                                            stats['path_to_low_priority'] += 1
-                                            if len(path_to_low_priority_samples) < 5:
-                                                path_to_low_priority_samples.append(f"{line} -> {domain} (路径规则->低优先级)")
-                                        else:
-                                            # 保持原动作或其他动作
-                                            if final_action not in path_domains_classified:
-                                                path_domains_classified[final_action] = set()
-                                            path_domains_classified[final_action].add(domain)
-                                            stats['path_kept_action'] += 1
-                                            if len(path_kept_action_samples) < 5:
-                                                path_kept_action_samples.append(f"{line} -> {domain} (路径规则->{final_action})")
-                                    else:
-                                        # 普通域名规则
-                                        if domain in domains:
-                                            stats['duplicate_domains'] += 1
-                                        else:
-                                            domains.add(domain)
-                                            stats['parsed_domains'] += 1
-                                            if len(accepted_samples) < 3:
-                                                accepted_samples.append(f"{line} -> {domain}")
-                            else:
-                                # 统计忽略原因
-                                if "特定路径" in (ignore_reason or ""):
-                                    stats['ignored_with_path'] += 1
-                                    if len(path_samples) < 3:
-                                        path_samples.append(line)
-                                elif ignore_reason in ["注释或空行", "仅包含注释"]:
-                                    stats['ignored_comments'] += 1
-                                    if len(comment_samples) < 3:
-                                        comment_samples.append(line)
-                                else:
-                                    stats['invalid_domains'] += 1
-                                    if len(ignored_samples) < 3:
-                                        ignored_samples.append(line)
-
-                        elif format_type == "v2ray":
-                            # 使用 v2ray 语法解析
-                            domain, ignore_reason = self.parse_v2ray_rule(line)
-                            if domain and len(accepted_samples) < 3:
-                                accepted_samples.append(f"v2ray: {line} -> {domain}")
-                            elif ignore_reason and len(ignored_samples) < 3:
-                                ignored_samples.append(f"v2ray: {line} ({ignore_reason})")
-
-                            if domain:
-                                # 检查是否应该从数据源跳过此域名
-                                should_skip, skip_reason = self.should_skip_domain_from_source(domain, source_name)
-                                if should_skip:
-                                    stats['skipped_domains'] += 1
-                                    if len(skip_samples) < 3:
-                                        skip_samples.append(f"{line} -> {domain} ({skip_reason})")
-                                else:
-                                    if domain in domains:
-                                        stats['duplicate_domains'] += 1
-                                    else:
-                                        domains.add(domain)
-                                        stats['parsed_domains'] += 1
-                            else:
-                                # 统计忽略原因
-                                if ignore_reason in ["注释或空行", "仅包含注释"]:
-                                    stats['ignored_comments'] += 1
-                                    if len(comment_samples) < 3:
-                                        comment_samples.append(line)
-                                elif ignore_reason == "无效域名":
-                                    stats['invalid_domains'] += 1
-                                    if len(ignored_samples) < 3:
-                                        ignored_samples.append(line)
+        Args:
+            source_action: 数据源动作
+            specific_path_action: 特定路径处理模式
+            content_hash: 当前内容的哈希
 
-                        else:
-                            # 普通域名格式 - 也需要处理行末注释
-                            cleaned_line = line
-                            if '#' in line:
-                                cleaned_line = line[:line.find('#')].strip()
-                                if not cleaned_line:
-                                    stats['ignored_comments'] += 1
-                                    if len(comment_samples) < 3:
-                                        comment_samples.append(line)
-                                    continue
-
-                            domain = self.clean_domain(self.extract_domain_from_rule(cleaned_line))
-                            if domain:
-                                # 检查是否应该从数据源跳过此域名
-                                should_skip, skip_reason = self.should_skip_domain_from_source(domain, source_name)
-                                if should_skip:
-                                    stats['skipped_domains'] += 1
-                                    if len(skip_samples) < 3:
-                                        skip_samples.append(f"{line} -> {domain} ({skip_reason})")
-                                else:
-                                    if domain in domains:
-                                        stats['duplicate_domains'] += 1
-                                    else:
-                                        domains.add(domain)
-                                        stats['parsed_domains'] += 1
-                                        if len(accepted_samples) < 3:
-                                            accepted_samples.append(f"{line} -> {domain}")
-                            else:
-                                stats['invalid_domains'] += 1
-                                if len(ignored_samples) < 3:
-                                    ignored_samples.append(line)
+        Returns:
+            校验键
+        """
+        if self._parse_fingerprint is None:
+            try:
+                with open(os.path.abspath(__file__), 'rb') as f:
+                    script_hash = hashlib.sha1(f.read()).hexdigest()
+            except OSError:
+                script_hash = ''
+            self._parse_fingerprint = hashlib.sha1(json.dumps(
+                [script_hash, self.config["parsing"], self.auto_classify_rules],
+                sort_keys=True, default=str
+            ).encode('utf-8')).hexdigest()
 
-                    except Exception as e:
-                        print(f"解析第 {line_num} 行时出错: {line[:50]}... - {e}")
-                        stats['invalid_domains'] += 1
-                        continue
-
-                # 计算本次请求中的 v2ray 标签数量和通配符规则数量
-                current_v2ray_tags = self.stats.get('v2ray_with_tags', 0) - initial_v2ray_tags
-                stats['v2ray_with_tags'] = current_v2ray_tags
-                stats['wildcard_rules_processed'] = self.stats.get('wildcard_rules_processed', 0)
-
-                # 计算特定路径域名总数
-                total_path_domains = sum(len(domain_set) for domain_set in path_domains_classified.values())
-
-                print(f"成功获取 {len(domains)} 个普通域名，{total_path_domains} 个特定路径域名")
-                print(f"  - 总规则: {stats['total_rules']}")
-                print(f"  - 成功解析: {stats['parsed_domains']}")
-                print(f"  - 忽略(特定路径): {stats['ignored_with_path']}")
-                print(f"  - 🔧 特定路径->低优先级: {stats['path_to_low_priority']}")
-                print(f"  - 🔧 特定路径保持原动作: {stats['path_kept_action']}")
-                print(f"  - 忽略(注释): {stats['ignored_comments']}")
-                print(f"  - 忽略(无效域名): {stats['invalid_domains']}")
-                print(f"  - 重复域名: {stats['duplicate_domains']}")
-                print(f"  - 跳过域名: {stats['skipped_domains']}")
-                if format_type == "v2ray" and stats['v2ray_with_tags'] > 0:
-                    print(f"  - v2ray 带标签规则: {stats['v2ray_with_tags']}")
-                if stats['wildcard_rules_processed'] > 0:
-                    print(f"  - 🔧 通配符规则处理: {stats['wildcard_rules_processed']}")
-
-                # 显示样本
-                if accepted_samples:
-                    print(f"  - 接受的规则样本:")
-                    for sample in accepted_samples:
-                        print(f"    ✓ {sample}")
-
-                if path_to_low_priority_samples:
-                    print(f"  - 🔧 特定路径->低优先级样本:")
-                    for sample in path_to_low_priority_samples:
-                        print(f"    📍 {sample}")
-
-                if path_kept_action_samples:
-                    print(f"  - 🔧 特定路径保持动作样本:")
-                    for sample in path_kept_action_samples:
-                        print(f"    🎯 {sample}")
-
-                if skip_samples:
-                    print(f"  - 跳过的域名样本:")
-                    for sample in skip_samples:
-                        print(f"    ⏭️ {sample}")
-
-                if path_samples:
-                    print(f"  - 忽略的路径规则样本:")
-                    for sample in path_samples:
-                        print(f"    🛤️  {sample}")
-
-                if comment_samples:
-                    print(f"  - 忽略的注释规则样本:")
-                    for sample in comment_samples:
-                        print(f"    # {sample}")
-
-                if ignored_samples:
-                    print(f"  - 其他忽略的规则样本:")
-                    for sample in ignored_samples:
-                        print(f"    ✗ {sample}")
+        key = json.dumps(
+            [self._parse_fingerprint, source_action, specific_path_action, content_hash]
+        )
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
 
-                return domains, path_domains_classified, stats
+    def _load_parsed_cache(self, path: Union[str, None], cache_key: str) -> Union[Tuple, None]:
+        """
+        读取解析结果缓存（JSON 格式，不执行任何代码）
 
-            except requests.RequestException as e:
-                print(f"获取失败 (尝试 {attempt + 1}/{retry_count}): {e}")
-                if attempt < retry_count - 1:
-                    time.sleep(retry_delay)
-                else:
-                    print(f"放弃获取 {url}")
+        Args:
+            path: 缓存文件路径
+            cache_key: 当前内容与配置的校验键
 
-        return domains, {}, stats
+        Returns:
+            (普通域名集合, 特定路径域名字典, 统计信息, 全局统计增量)，
+            缓存不存在、已损坏或内容/配置已变化时返回 None
+        """
+        if not path or not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached["key"] != cache_key:
+                return None
+            return (
+                set(cached["domains"]),
+                {action: set(domains) for action, domains in cached["path_domains"].items()},
+                dict(cached["stats"]),
+                dict(cached["stats_deltas"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def _save_parsed_cache(self, path: Union[str, None], cache_key: str, result: Tuple) -> None:
+        """
+        写入解析结果缓存，域名集合保存为排序后的列表
+
+        Args:
+            path: 缓存文件路径
+            cache_key: 内容与配置的校验键
+            result: (普通域名集合, 特定路径域名字典, 统计信息, 全局统计增量)
+        """
+        if not path:
+            return
+
+        domains, path_domains_classified, stats, stats_deltas = result
+        cached = {
+            "key": cache_key,
+            "domains": sorted(domains),
+            "path_domains": {
+                action: sorted(domain_set)
+                for action, domain_set in path_domains_classified.items()
+            },
+            "stats": stats,
+            "stats_deltas": stats_deltas,
+        }
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(cached, f, ensure_ascii=False)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"  ⚠️  写入解析缓存失败: {e}")
 
     def _parse_csv_from_response(self, csv_content: str, csv_config: Dict, source_name: str, stats: Dict) -> Tuple[Set[str], Dict[str, Set[str]], Dict]:
         """
@@ -1660,82 +2294,108 @@ class SearXNGHostnamesGenerator:
         column_index = csv_config.get("column_index")
 
         try:
-            csv_reader = csv.reader(csv_content.strip().split('\n'), delimiter=delimiter)
+            # 逐行交给 csv 模块，不再复制整段内容或构建行列表；首尾空白的处理与 strip() 一致
+            csv_reader = csv.reader(self._iter_stripped_lines(csv_content), delimiter=delimiter)
 
             headers = None
+            header_rows = 0
             actual_column_index = None
             skip_samples = []  # 跳过的域名样本
             accepted_samples = []  # 接受的域名样本
 
-            for row_num, row in enumerate(csv_reader, 1):
-                if not row or all(cell.strip() == '' for cell in row):
-                    continue  # 跳过空行
-
-                stats['total_rules'] += 1
-
-                # 处理头部行
-                if has_header and row_num == 1:
-                    headers = [cell.strip() for cell in row]
-
-                    # 如果指定了列名，找到对应的索引
-                    if column:
-                        try:
-                            actual_column_index = headers.index(column)
-                            print(f"  📍 CSV 找到目标列 '{column}' 位于索引 {actual_column_index}")
-                        except ValueError:
-                            print(f"  ❌ CSV 未找到指定的列名 '{column}'")
-                            print(f"  📋 CSV 可用的列名: {', '.join(headers)}")
-                            return domains, path_domains, stats
-                    elif column_index is not None:
-                        actual_column_index = column_index
-                        if actual_column_index < len(headers):
-                            print(f"  📍 CSV 使用列索引 {actual_column_index}: '{headers[actual_column_index]}'")
-                        else:
-                            print(f"  ❌ CSV 列索引 {actual_column_index} 超出范围")
-                            return domains, path_domains, stats
-
-                    continue  # 跳过头部行
-
-                # 如果没有设置实际列索引，使用配置的列索引
-                if actual_column_index is None and column_index is not None:
+            # csv 模块的 C 解析器完成分词，逐行过滤空行（所有单元格都为空白）
+            rows = (
+                (row_num, row) for row_num, row in enumerate(csv_reader, 1)
+                if ''.join(row).strip()
+            )
+            first_row = next(rows, None)
+
+            # 处理头部行
+            if has_header and first_row and first_row[0] == 1:
+                header_rows = 1
+                headers = [cell.strip() for cell in first_row[1]]
+                first_row = None  # 跳过头部行
+
+                # 如果指定了列名，找到对应的索引
+                if column:
+                    try:
+                        actual_column_index = headers.index(column)
+                        print(f"  📍 CSV 找到目标列 '{column}' 位于索引 {actual_column_index}")
+                    except ValueError:
+                        print(f"  ❌ CSV 未找到指定的列名 '{column}'")
+                        print(f"  📋 CSV 可用的列名: {', '.join(headers)}")
+                        stats['total_rules'] += header_rows
+                        return domains, path_domains, stats
+                elif column_index is not None:
                     actual_column_index = column_index
+                    if actual_column_index < len(headers):
+                        column_name = headers[actual_column_index]
+                        print(f"  📍 CSV 使用列索引 {actual_column_index}: '{column_name}'")
+                    else:
+                        print(f"  ❌ CSV 列索引 {actual_column_index} 超出范围")
+                        stats['total_rules'] += header_rows
+                        return domains, path_domains, stats
+
+            # 如果没有设置实际列索引，使用配置的列索引
+            if actual_column_index is None and column_index is not None:
+                actual_column_index = column_index
+
+            if first_row:
+                rows = chain([first_row], rows)
+
+            # 只保留目标列的值，缺少目标列的行记为空值；空值计为无效
+            if actual_column_index is not None:
+                values = [
+                    row[actual_column_index].strip() if actual_column_index < len(row) else ''
+                    for _, row in rows
+                ]
+            else:
+                values = [''] * sum(1 for _ in rows)
+            url_values = list(filter(None, values))
+
+            stats['total_rules'] += header_rows + len(values)
+            stats['csv_parsed_rows'] += len(values)
+            stats['invalid_domains'] += len(values) - len(url_values)
+
+            # 对整列批量提取 hostname（值已过滤为非空，直接调用模块级提取函数）
+            url_domains = [
+                (url_value, domain)
+                for url_value, domain in zip(url_values, map(_extract_hostname, url_values))
+                if domain
+            ]
+            invalid_url_count = len(url_values) - len(url_domains)
+
+            # 检查是否应该从数据源跳过，没有 skip 规则时整列保留
+            if self._skip_by_domain or self._skip_wildcards:
+                kept = []
+                for url_value, domain in url_domains:
+                    should_skip, skip_reason = self.should_skip_domain_from_source(
+                        domain, source_name
+                    )
+                    if should_skip:
+                        if len(skip_samples) < 3:
+                            skip_samples.append(f"{url_value} -> {domain} ({skip_reason})")
+                    else:
+                        kept.append((url_value, domain))
+            else:
+                kept = url_domains
 
-                stats['csv_parsed_rows'] += 1
+            # 显示一些解析样本（每个域名首次出现的 URL）
+            for url_value, domain in kept:
+                if len(accepted_samples) >= 5:
+                    break
+                if domain not in domains:
+                    domains.add(domain)
+                    accepted_samples.append(f"{url_value} -> {domain}")
 
-                try:
-                    # 解析 CSV 行
-                    if actual_column_index is not None and actual_column_index < len(row):
-                        url_value = row[actual_column_index].strip()
-                        if url_value:
-                            domain = self.extract_hostname_from_url(url_value)
-                            if domain:
-                                # 检查是否应该从数据源跳过此域名
-                                should_skip, skip_reason = self.should_skip_domain_from_source(domain, source_name)
-                                if should_skip:
-                                    stats['skipped_domains'] += 1
-                                    if len(skip_samples) < 3:
-                                        skip_samples.append(f"{url_value} -> {domain} ({skip_reason})")
-                                else:
-                                    if domain not in domains:
-                                        domains.add(domain)
-                                        stats['parsed_domains'] += 1
-                                        stats['csv_extracted_domains'] += 1
-
-                                        # 显示一些解析样本
-                                        if len(accepted_samples) < 5:
-                                            accepted_samples.append(f"{url_value} -> {domain}")
-                                    else:
-                                        stats['duplicate_domains'] += 1
-                            else:
-                                stats['csv_invalid_urls'] += 1
-                        else:
-                            stats['invalid_domains'] += 1
-                    else:
-                        stats['invalid_domains'] += 1
+            # 整体并入域名集合，重复数由集合大小差值得出
+            domains.update([domain for _, domain in kept])
 
-                except Exception as e:
-                    print(f"    ❌ CSV 解析第 {row_num} 行时出错: {e}")
-                    stats['invalid_domains'] += 1
+            stats['skipped_domains'] += len(url_domains) - len(kept)
+            stats['parsed_domains'] += len(domains)
+            stats['csv_extracted_domains'] += len(domains)
+            stats['duplicate_domains'] += len(kept) - len(domains)
+            stats['csv_invalid_urls'] += invalid_url_count
 
             print(f"  ✅ CSV 解析完成: {stats['csv_extracted_domains']} 个有效域名")
 
@@ -1810,7 +2470,7 @@ class SearXNGHostnamesGenerator:
                 domain = domain[4:]
 
         # 移除空格和特殊字符
-        domain = re.sub(r'[^\w.-]', '', domain)
+        domain = _CLEAN_RE.sub('', domain)
 
         # 检查是否是IP地址
         if self.config["parsing"]["ignore_ip"] and self.is_ip_address(domain):
@@ -1836,8 +2496,10 @@ class SearXNGHostnamesGenerator:
         Returns:
             是否是IP地址
         """
-        ip_pattern = re.compile(r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$')
-        return bool(ip_pattern.match(domain))
+        # 绝大多数输入是域名：点号数量不为 3 或首字符不是数字时直接排除，不进入正则匹配
+        if domain.count('.') != 3 or not domain[:1].isdigit():
+            return False
+        return _IPV4_RE.match(domain) is not None
 
     def is_valid_domain(self, domain: str) -> bool:
         """
@@ -1849,41 +2511,26 @@ class SearXNGHostnamesGenerator:
         Returns:
             是否为有效域名
         """
-        if not domain or len(domain) > 255:
-            return False
-
-        # 🔧 改进的域名格式验证，更宽松
-        # 允许更多字符，包括一些特殊情况
-
-        # 基本检查：至少包含一个点
-        if '.' not in domain:
-            return False
-
-        # 分割域名各部分
-        parts = domain.split('.')
-
-        # 检查是否有空的部分
-        if any(not part for part in parts):
+        if not domain:
             return False
 
-        # 检查每个部分的格式
-        for part in parts:
-            # 🔧 允许更宽松的字符集，包括连字符
-            if not re.match(r'^[a-zA-Z0-9]([a-zA-Z0-9-]*[a-zA-Z0-9])?$', part):
-                # 🔧 特殊情况：单个字符的部分也允许
-                if len(part) == 1 and re.match(r'^[a-zA-Z0-9]$', part):
-                    continue
-                return False
+        # 单个预编译正则一次性校验整个域名（长度、每段字符集与长度、TLD 长度）
+        return _DOMAIN_RE.match(domain) is not None
 
-            # 检查长度限制
-            if len(part) > 63:
-                return False
+    def _esc(self, text: str) -> str:
+        """
+        带缓存的 re.escape，规则生成过程中同一域名和TLD会被反复转义
 
-        # 检查最后一个部分（TLD）是否至少有2个字符
-        if len(parts[-1]) < 2:
-            return False
+        Args:
+            text: 原字符串
 
-        return True
+        Returns:
+            转义后的字符串
+        """
+        escaped = self._esc_cache.get(text)
+        if escaped is None:
+            escaped = self._esc_cache[text] = re.escape(text)
+        return escaped
 
     def domain_to_regex(self, domain: str) -> str:
         """
@@ -1896,9 +2543,9 @@ class SearXNGHostnamesGenerator:
             正则表达式字符串
         """
         # 转义特殊字符
-        escaped_domain = re.escape(domain)
+        escaped_domain = self._esc(domain)
         # 添加子域名匹配
-        return f'(.*\.)?{escaped_domain}$'
+        return f'(?:.*\.)?{escaped_domain}$'
 
     def smart_sort_domains(self, domains: Set[str]) -> List[str]:
         """
@@ -1916,12 +2563,9 @@ class SearXNGHostnamesGenerator:
             生成域名排序键：(TLD, 反向域名主体)
             这样可以将同TLD的域名聚集在一起，便于合并
             """
-            parts = domain.split('.')
-            if len(parts) >= 2:
-                # TLD 作为主要排序键
-                tld = parts[-1]
-                # 域名主体作为次要排序键，反向排序便于找到公共后缀
-                base = '.'.join(parts[:-1])
+            base, dot, tld = domain.rpartition('.')
+            if dot:
+                # TLD 作为主要排序键，域名主体作为次要排序键
                 return (tld, base)
             else:
                 return (domain, '')
@@ -1950,10 +2594,9 @@ class SearXNGHostnamesGenerator:
             domains = self.smart_sort_domains(domains)
 
         for domain in domains:
-            parts = domain.split('.')
-            if len(parts) >= 2:
+            _, dot, tld = domain.rpartition('.')
+            if dot:
                 # 获取顶级域名（如 .com, .org）
-                tld = parts[-1]
                 tld_groups[tld].append(domain)
             else:
                 # 处理无效域名
@@ -1971,10 +2614,8 @@ class SearXNGHostnamesGenerator:
         Returns:
             (域名主体, TLD)
         """
-        parts = domain.split('.')
-        if len(parts) >= 2:
-            tld = parts[-1]
-            base = '.'.join(parts[:-1])
+        base, dot, tld = domain.rpartition('.')
+        if dot:
             return base, tld
         return domain, ''
 
@@ -1995,17 +2636,8 @@ class SearXNGHostnamesGenerator:
         if not strings:
             return ""
 
-        min_len = min(len(s) for s in strings)
-        prefix = ""
-
-        for i in range(min_len):
-            char = strings[0][i]
-            if all(s[i] == char for s in strings):
-                prefix += char
-            else:
-                break
-
-        return prefix
+        # 字典序最小与最大的字符串的公共前缀即为全体的公共前缀
+        return commonprefix(strings)
 
     def find_common_suffix(self, strings: List[str]) -> str:
         """
@@ -2026,8 +2658,7 @@ class SearXNGHostnamesGenerator:
 
         # 反转字符串，找前缀，再反转回来
         reversed_strings = [s[::-1] for s in strings]
-        reversed_suffix = self.find_common_prefix(reversed_strings)
-        return reversed_suffix[::-1]
+        return commonprefix(reversed_strings)[::-1]
 
     def create_advanced_tld_regex(self, tld_domains: List[str], tld: str) -> str:
         """
@@ -2042,7 +2673,7 @@ class SearXNGHostnamesGenerator:
             优化后的正则表达式
         """
         if len(tld_domains) == 1:
-            return re.escape(tld_domains[0])
+            return self._esc(tld_domains[0])
 
         # 提取域名主体部分
         domain_bases = []
@@ -2055,7 +2686,7 @@ class SearXNGHostnamesGenerator:
                 domain_bases.append(domain)
 
         if not domain_bases:
-            return '|'.join(re.escape(d) for d in tld_domains)
+            return '|'.join(self._esc(d) for d in tld_domains)
 
         # 尝试找到公共模式
         optimized_pattern = self.optimize_domain_bases(domain_bases)
@@ -2066,7 +2697,7 @@ class SearXNGHostnamesGenerator:
 
         if len(simple_domains) == len(domain_bases):
             # 所有都是二级域名，可以进行TLD优化
-            return f"({optimized_pattern})\\.{re.escape(tld)}"
+            return f"(?:{optimized_pattern})\\.{self._esc(tld)}"
         elif len(complex_domains) == len(domain_bases):
             # 所有都是多级域名，需要检查是否有公共的二级+TLD后缀
             return self._optimize_complex_domains_with_tld(domain_bases, tld)
@@ -2091,8 +2722,8 @@ class SearXNGHostnamesGenerator:
         # 找到所有域名的公共后缀（不包括第一部分）
         if len(domain_bases) <= 1:
             if domain_bases:
-                return f"{re.escape(domain_bases[0])}\\.{re.escape(tld)}"
-            return f".*\\.{re.escape(tld)}"
+                return f"{self._esc(domain_bases[0])}\\.{self._esc(tld)}"
+            return f".*\\.{self._esc(tld)}"
 
         # 分析结构：检查是否所有域名都有相同的后缀结构
         common_suffix_parts = None
@@ -2114,26 +2745,27 @@ class SearXNGHostnamesGenerator:
                 if len(parts) >= len(common_suffix_parts) + 1:
                     current_suffix = parts[-(len(common_suffix_parts)):]
                     if current_suffix == common_suffix_parts:
-                        prefixes.append(parts[0])
+                        # 前缀保留公共后缀之前的全部部分，避免丢失中间层级
+                        prefixes.append('.'.join(parts[:-len(common_suffix_parts)]))
                     else:
                         # 后缀不匹配，无法优化，直接返回完整域名列表
-                        escaped_bases = [re.escape(base) for base in domain_bases]
-                        return f"({'|'.join(escaped_bases)})\\.{re.escape(tld)}"
+                        escaped_bases = [self._esc(base) for base in domain_bases]
+                        return f"(?:{'|'.join(escaped_bases)})\\.{self._esc(tld)}"
                 else:
                     # 长度不够，无法优化
-                    escaped_bases = [re.escape(base) for base in domain_bases]
-                    return f"({'|'.join(escaped_bases)})\\.{re.escape(tld)}"
+                    escaped_bases = [self._esc(base) for base in domain_bases]
+                    return f"(?:{'|'.join(escaped_bases)})\\.{self._esc(tld)}"
 
         # 如果找到了公共后缀，进行优化
         if common_suffix_parts and len(set(prefixes)) > 1:
             # 优化前缀部分
             optimized_prefixes = self.optimize_domain_bases(prefixes)
-            escaped_suffix = '\\.'.join(re.escape(part) for part in common_suffix_parts)
-            return f"({optimized_prefixes})\\.{escaped_suffix}\\.{re.escape(tld)}"
+            escaped_suffix = '\\.'.join(self._esc(part) for part in common_suffix_parts)
+            return f"(?:{optimized_prefixes})\\.{escaped_suffix}\\.{self._esc(tld)}"
         else:
             # 无法找到公共模式，使用基础优化
             optimized_pattern = self.optimize_domain_bases(domain_bases)
-            return f"({optimized_pattern})\\.{re.escape(tld)}"
+            return f"(?:{optimized_pattern})\\.{self._esc(tld)}"
 
     def _optimize_mixed_domains_with_tld(self, simple_domains: List[str], complex_domains: List[str], tld: str) -> str:
         """
@@ -2152,10 +2784,10 @@ class SearXNGHostnamesGenerator:
         # 处理二级域名
         if simple_domains:
             if len(simple_domains) == 1:
-                patterns.append(f"{re.escape(simple_domains[0])}\\.{re.escape(tld)}")
+                patterns.append(f"{self._esc(simple_domains[0])}\\.{self._esc(tld)}")
             else:
                 optimized_simple = self.optimize_domain_bases(simple_domains)
-                patterns.append(f"({optimized_simple})\\.{re.escape(tld)}")
+                patterns.append(f"(?:{optimized_simple})\\.{self._esc(tld)}")
 
         # 处理多级域名
         if complex_domains:
@@ -2166,11 +2798,12 @@ class SearXNGHostnamesGenerator:
         if len(patterns) == 1:
             return patterns[0]
         else:
-            return f"({'|'.join(patterns)})"
+            return f"(?:{'|'.join(patterns)})"
 
     def optimize_domain_bases(self, domain_bases: List[str]) -> str:
         """
         优化域名基础部分列表
+        先提取全局公共后缀，再用字符前缀树在每个分叉处合并公共前缀
 
         Args:
             domain_bases: 域名基础部分列表
@@ -2178,39 +2811,97 @@ class SearXNGHostnamesGenerator:
         Returns:
             优化后的正则表达式模式
         """
+        domain_bases = sorted(set(domain_bases))
         if len(domain_bases) <= 1:
-            return '|'.join(re.escape(base) for base in domain_bases)
+            return '|'.join(self._esc(base) for base in domain_bases)
 
         optimization_config = self.config["optimization"]
 
-        # 尝试前缀优化
-        if optimization_config.get("enable_prefix_optimization", True):
-            common_prefix = self.find_common_prefix(domain_bases)
-            min_prefix_len = optimization_config.get("min_common_prefix_length", 3)
-
-            if len(common_prefix) >= min_prefix_len:
-                # 移除公共前缀
-                suffixes = [base[len(common_prefix):] for base in domain_bases]
-                suffixes = [s for s in suffixes if s]  # 过滤空后缀
-                if suffixes and len(set(suffixes)) > 1:  # 确保有不同的后缀
-                    suffix_pattern = self.optimize_domain_bases(suffixes)
-                    return f"{re.escape(common_prefix)}({suffix_pattern})"
-
         # 尝试后缀优化
         if optimization_config.get("enable_suffix_optimization", True):
             common_suffix = self.find_common_suffix(domain_bases)
             min_suffix_len = optimization_config.get("min_common_suffix_length", 3)
 
             if len(common_suffix) >= min_suffix_len:
-                # 移除公共后缀
+                # 移除公共后缀，仅当每个前缀都非空时才能无损提取
                 prefixes = [base[:-len(common_suffix)] for base in domain_bases]
-                prefixes = [p for p in prefixes if p]  # 过滤空前缀
-                if prefixes and len(set(prefixes)) > 1:  # 确保有不同的前缀
+                if all(prefixes):
                     prefix_pattern = self.optimize_domain_bases(prefixes)
-                    return f"({prefix_pattern}){re.escape(common_suffix)}"
+                    return f"(?:{prefix_pattern}){self._esc(common_suffix)}"
+
+        # 尝试前缀优化（前缀树）
+        if optimization_config.get("enable_prefix_optimization", True):
+            min_prefix_len = optimization_config.get("min_common_prefix_length", 3)
+            alternatives = self._emit_trie_alternatives(
+                self._build_trie(domain_bases), min_prefix_len
+            )
+            return '|'.join(alternatives)
 
         # 没有找到优化模式，直接连接
-        return '|'.join(re.escape(base) for base in domain_bases)
+        return '|'.join(self._esc(base) for base in domain_bases)
+
+    @staticmethod
+    def _build_trie(strings: List[str]) -> Dict[str, dict]:
+        """
+        构建字符前缀树
+
+        Args:
+            strings: 字符串列表
+
+        Returns:
+            嵌套字典形式的前缀树，键 '' 表示此处为某个字符串的结尾
+        """
+        trie = {}
+        for string in strings:
+            node = trie
+            for char in string:
+                node = node.setdefault(char, {})
+            node[''] = True
+        return trie
+
+    def _emit_trie_alternatives(
+        self, node: Dict[str, dict], min_prefix_len: int, lead_len: int = 0
+    ) -> List[str]:
+        """
+        将前缀树转换为正则分支列表
+
+        Args:
+            node: 前缀树节点
+            min_prefix_len: 合并公共前缀所需的最小长度，较短的前缀直接展开
+            lead_len: 当前分支中位于此节点之前的字面前缀长度
+
+        Returns:
+            正则分支列表，空字符串表示当前节点本身是结尾
+        """
+        alternatives = []
+        for char, child in node.items():
+            if not char:
+                alternatives.append('')
+                continue
+
+            # 压缩单链路径
+            run = char
+            while len(child) == 1 and '' not in child:
+                (next_char, child), = child.items()
+                run += next_char
+
+            escaped_run = self._esc(run)
+            prefix_len = lead_len + len(run)
+            can_group = prefix_len >= min_prefix_len
+            sub_alternatives = self._emit_trie_alternatives(
+                child, min_prefix_len, 0 if can_group else prefix_len
+            )
+
+            if len(sub_alternatives) == 1:
+                alternatives.append(escaped_run + sub_alternatives[0])
+            elif can_group:
+                branches = [alt for alt in sub_alternatives if alt]
+                optional = '?' if len(branches) < len(sub_alternatives) else ''
+                alternatives.append(f"{escaped_run}(?:{'|'.join(branches)}){optional}")
+            else:
+                alternatives.extend(escaped_run + alt for alt in sub_alternatives)
+
+        return alternatives
 
     def create_single_regex_rule(self, domains: Union[Set[str], List[str]]) -> str:
         """
@@ -2230,7 +2921,7 @@ class SearXNGHostnamesGenerator:
             domains = self.smart_sort_domains(domains)
 
         if len(domains) == 1:
-            return f"(.*\\.)?{re.escape(domains[0])}$"
+            return f"(?:.*\\.)?{self._esc(domains[0])}$"
 
         print(f"🚀 正在生成高级TLD优化单行正则表达式，包含 {len(domains)} 个域名")
 
@@ -2256,7 +2947,7 @@ class SearXNGHostnamesGenerator:
                 if len(tld_domains) == 1:
                     # 单个域名直接处理
                     domain = tld_domains[0]
-                    tld_patterns.append(re.escape(domain))
+                    tld_patterns.append(self._esc(domain))
                 else:
                     # 多个域名进行高级优化
                     optimized_pattern = self.create_advanced_tld_regex(tld_domains, tld)
@@ -2267,14 +2958,14 @@ class SearXNGHostnamesGenerator:
             if len(tld_patterns) == 1:
                 combined_pattern = tld_patterns[0]
             else:
-                combined_pattern = f"({'|'.join(tld_patterns)})"
+                combined_pattern = f"(?:{'|'.join(tld_patterns)})"
 
-            single_regex = f"(.*\\.)?{combined_pattern}$"
+            single_regex = f"(?:.*\\.)?{combined_pattern}$"
         else:
             # 简单合并模式
-            escaped_domains = [re.escape(d) for d in domains]
+            escaped_domains = [self._esc(d) for d in domains]
             combined_pattern = '|'.join(escaped_domains)
-            single_regex = f"(.*\\.)?({combined_pattern})$"
+            single_regex = f"(?:.*\\.)?(?:{combined_pattern})$"
 
         # 显示规则长度信息
         rule_length = len(single_regex)
@@ -2348,37 +3039,49 @@ class SearXNGHostnamesGenerator:
         rules = []
         current_batch = []
 
-        for domain in domains:
-            test_batch = current_batch + [domain]
+        if tld and self.config["optimization"].get("enable_advanced_tld_merge", True):
+            build_rule = lambda batch: self._create_tld_optimized_rule(batch, tld)
+        else:
+            build_rule = self._create_simple_rule
 
-            # 创建测试规则
-            if tld and self.config["optimization"].get("enable_advanced_tld_merge", True):
-                test_rule = self._create_tld_optimized_rule(test_batch, tld)
-            else:
-                test_rule = self._create_simple_rule(test_batch)
+        # 当前批次规则长度的上界：优化后的规则不会长于逐个转义后用 | 拼接的域名，
+        # 每个域名最多再引入 5 个分组符号（(?: ) ?），外层包装长度为常数。
+        # 上界未超限时无需为每个候选域名重建测试规则，只在接近上限时才精确计算
+        length_bound = 0
+        # 已为当前批次精确构建过的规则，批次落盘时直接复用
+        current_rule = None
+
+        for domain in domains:
+            domain_bound = len(self._esc(domain)) + 6
+            test_rule = None
 
             # 检查是否超过限制
-            if (len(test_batch) > max_domains_per_rule or
-                len(test_rule) > max_rule_length):
+            if len(current_batch) + 1 > max_domains_per_rule:
+                exceeded = True
+            elif length_bound + domain_bound + _RULE_WRAPPER_SLACK <= max_rule_length:
+                exceeded = False
+            else:
+                # 创建测试规则
+                test_rule = build_rule(current_batch + [domain])
+                exceeded = len(test_rule) > max_rule_length
 
+            if exceeded:
                 # 保存当前批次
                 if current_batch:
-                    if tld and self.config["optimization"].get("enable_advanced_tld_merge", True):
-                        rules.append(self._create_tld_optimized_rule(current_batch, tld))
-                    else:
-                        rules.append(self._create_simple_rule(current_batch))
+                    rules.append(current_rule or build_rule(current_batch))
 
                 # 开始新批次
                 current_batch = [domain]
+                length_bound = domain_bound
+                current_rule = None
             else:
                 current_batch.append(domain)
+                length_bound += domain_bound
+                current_rule = test_rule
 
         # 处理最后一个批次
         if current_batch:
-            if tld and self.config["optimization"].get("enable_advanced_tld_merge", True):
-                rules.append(self._create_tld_optimized_rule(current_batch, tld))
-            else:
-                rules.append(self._create_simple_rule(current_batch))
+            rules.append(current_rule or build_rule(current_batch))
 
         return rules
 
@@ -2394,10 +3097,10 @@ class SearXNGHostnamesGenerator:
             TLD优化的正则表达式规则
         """
         if len(domains) == 1:
-            return f"(.*\\.)?{re.escape(domains[0])}$"
+            return f"(?:.*\\.)?{self._esc(domains[0])}$"
 
         optimized_pattern = self.create_advanced_tld_regex(domains, tld)
-        return f"(.*\\.)?{optimized_pattern}$"
+        return f"(?:.*\\.)?{optimized_pattern}$"
 
     def _create_simple_rule(self, domains: List[str]) -> str:
         """
@@ -2410,10 +3113,10 @@ class SearXNGHostnamesGenerator:
             简单的正则表达式规则
         """
         if len(domains) == 1:
-            return f"(.*\\.)?{re.escape(domains[0])}$"
+            return f"(?:.*\\.)?{self._esc(domains[0])}$"
         else:
             pattern = self.optimize_domain_bases(domains)
-            return f"(.*\\.)?({pattern})$"
+            return f"(?:.*\\.)?(?:{pattern})$"
 
     def merge_domains_to_regex(self, domains: Set[str]) -> List[str]:
         """
@@ -2447,6 +3150,118 @@ class SearXNGHostnamesGenerator:
         print(f"  ✅ 优化完成: {len(domains)} 个域名 -> {len(rules)} 个规则")
         return rules
 
+    @staticmethod
+    def _group_by_auto_action(auto_classified: Dict[str, Tuple[str, str]]) -> Dict[str, List[str]]:
+        """
+        将自动分类结果按动作分组
+
+        Args:
+            auto_classified: 域名到 (动作, 原因) 的映射
+
+        Returns:
+            Dict[str, List[str]]: 动作到域名列表的映射
+        """
+        grouped = defaultdict(list)
+        for domain, (auto_action, _) in auto_classified.items():
+            grouped[auto_action].append(domain)
+        return grouped
+
+    def _collect_source_domains(
+        self, source: Dict, categorized_domains: Dict[str, Set[str]]
+    ) -> None:
+        """
+        获取并解析单个在线数据源，按自动分类规则和源动作把域名加入相应类别
+
+        Args:
+            source: 数据源配置
+            categorized_domains: 分类后的域名字典（原地更新）
+        """
+        print(f"\n处理数据源: {source['name']}")
+        format_type = source.get("format", "domain")
+        csv_config = source.get("csv_config") if format_type == "csv" else None
+        source_action = source.get("action", "remove")
+        print(f"格式类型: {format_type}，原始动作: {source_action}")
+
+        # 🔧 设置临时变量供 fetch_domain_list 使用
+        self._current_source_action = source_action
+
+        # 🔧 修复：获取普通域名和已分类的特定路径域名
+        domains, path_domains_classified, source_stats = self.fetch_domain_list(
+            source["url"], format_type, source["name"], csv_config
+        )
+
+        # 累加统计信息（只累加已登记的统计项）
+        self.stats.update(
+            {key: source_stats[key] for key in self.stats.keys() & source_stats.keys()}
+        )
+
+        # 🔧 处理普通域名分类：先整体查出命中自动分类规则的域名，再批量写入各类别
+        auto_classified = {
+            domain: match
+            for domain, match in zip(domains, map(self.get_auto_classify_action, domains))
+            if match[0]
+        }
+        auto_classified_count = len(auto_classified)
+
+        for domain, (auto_action, reason) in islice(auto_classified.items(), 5):  # 显示前5个样本
+            print(f"  🔄 自动分类: {domain} -> {auto_action} ({reason})")
+
+        # 从原始集合中移除，按动作分组后批量添加到相应类别
+        for auto_action, grouped_domains in self._group_by_auto_action(auto_classified).items():
+            categorized_domains[auto_action].update(grouped_domains)
+        domains.difference_update(auto_classified)
+
+        # 其余域名使用源的默认动作
+        if source_action in categorized_domains:
+            categorized_domains[source_action].update(domains)
+
+        # 🔧 处理特定路径域名（已经按动作分类）
+        path_auto_classified_count = 0
+        total_path_domains = 0
+
+        for path_action, path_domain_set in path_domains_classified.items():
+            # 检查自动分类规则（优先级最高）
+            path_auto_classified = {
+                domain: match
+                for domain, match in zip(
+                    path_domain_set, map(self.get_auto_classify_action, path_domain_set)
+                )
+                if match[0]
+            }
+
+            sample_quota = max(0, 3 - path_auto_classified_count)  # 所有路径动作合计显示前3个样本
+            for domain, (auto_action, reason) in islice(path_auto_classified.items(), sample_quota):
+                print(f"  🔄 特定路径域名自动分类覆盖: {domain} -> {auto_action} ({reason}) (原为 {path_action})")
+            path_auto_classified_count += len(path_auto_classified)
+
+            grouped_by_action = self._group_by_auto_action(path_auto_classified)
+            for auto_action, grouped_domains in grouped_by_action.items():
+                categorized_domains[auto_action].update(grouped_domains)
+
+            # 其余域名使用已确定的路径动作
+            if path_action in categorized_domains:
+                categorized_domains[path_action].update(
+                    path_domain_set.difference(path_auto_classified)
+                )
+            total_path_domains += len(path_domain_set) - len(path_auto_classified)
+
+        auto_classified_count += path_auto_classified_count
+
+        if auto_classified_count > 0:
+            print(f"  ✅ 自动分类处理: {auto_classified_count} 个域名 "
+                  f"(普通: {auto_classified_count - path_auto_classified_count}, "
+                  f"特定路径: {path_auto_classified_count})")
+            self.stats['auto_classified'] += auto_classified_count
+
+        # 记录从数据源跳过的域名数量
+        self.stats['skipped_from_sources'] += source_stats.get('skipped_domains', 0)
+
+        total_added = len(domains) + total_path_domains
+        print(f"已添加 {total_added} 个域名到相应类别 (普通: {len(domains)}, 特定路径: {total_path_domains})")
+
+        # 清除临时变量
+        delattr(self, '_current_source_action')
+
     def collect_domains(self) -> Dict[str, Set[str]]:
         """
         🔧 修复：从所有配置的源收集域名，正确处理特定路径规则的动作分配
@@ -2461,7 +3276,7 @@ class SearXNGHostnamesGenerator:
         }
 
         # 重置统计信息
-        self.stats = {
+        self.stats = Counter({
             'total_rules': 0,
             'parsed_domains': 0,
             'ignored_with_path': 0,
@@ -2480,7 +3295,7 @@ class SearXNGHostnamesGenerator:
             'csv_invalid_urls': 0,
             'csv_extracted_domains': 0,
             'wildcard_rules_processed': 0,  # 🔧 处理的通配符规则数量
-        }
+        })
 
         # 记录每个类别的域名数量
         self.category_domain_counts = {
@@ -2491,79 +3306,32 @@ class SearXNGHostnamesGenerator:
             'replace': 0
         }
 
-        # 从在线源收集域名
-        for source in self.config["sources"]:
-            if not source.get("enabled", True):
-                continue
-
-            print(f"\n处理数据源: {source['name']}")
-            format_type = source.get("format", "domain")
-            csv_config = source.get("csv_config") if format_type == "csv" else None
-            source_action = source.get("action", "remove")
-            print(f"格式类型: {format_type}，原始动作: {source_action}")
-
-            # 🔧 设置临时变量供 fetch_domain_list 使用
-            self._current_source_action = source_action
-
-            # 🔧 修复：获取普通域名和已分类的特定路径域名
-            domains, path_domains_classified, source_stats = self.fetch_domain_list(source["url"], format_type, source["name"], csv_config)
-
-            # 累加统计信息
-            for key in self.stats:
-                if key in source_stats:
-                    self.stats[key] += source_stats[key]
-
-            # 🔧 处理普通域名分类
-            auto_classified_count = 0
-
-            for domain in list(domains):
-                # 检查自动分类规则
-                auto_action, reason = self.get_auto_classify_action(domain)
-                if auto_action:
-                    # 从原始集合中移除，添加到相应类别
-                    domains.remove(domain)
-                    categorized_domains[auto_action].add(domain)
-                    auto_classified_count += 1
-                    if auto_classified_count <= 5:  # 显示前5个样本
-                        print(f"  🔄 自动分类: {domain} -> {auto_action} ({reason})")
-                else:
-                    # 使用源的默认动作
-                    if source_action in categorized_domains:
-                        categorized_domains[source_action].add(domain)
-
-            # 🔧 处理特定路径域名（已经按动作分类）
-            path_auto_classified_count = 0
-            total_path_domains = 0
-
-            for path_action, path_domain_set in path_domains_classified.items():
-                for domain in path_domain_set:
-                    # 检查自动分类规则（优先级最高）
-                    auto_action, reason = self.get_auto_classify_action(domain)
-                    if auto_action:
-                        categorized_domains[auto_action].add(domain)
-                        path_auto_classified_count += 1
-                        if path_auto_classified_count <= 3:
-                            print(f"  🔄 特定路径域名自动分类覆盖: {domain} -> {auto_action} ({reason}) (原为 {path_action})")
-                    else:
-                        # 使用已确定的路径动作
-                        if path_action in categorized_domains:
-                            categorized_domains[path_action].add(domain)
-                        total_path_domains += 1
-
-            auto_classified_count += path_auto_classified_count
-
-            if auto_classified_count > 0:
-                print(f"  ✅ 自动分类处理: {auto_classified_count} 个域名 (普通: {auto_classified_count - path_auto_classified_count}, 特定路径: {path_auto_classified_count})")
-                self.stats['auto_classified'] += auto_classified_count
-
-            # 记录从数据源跳过的域名数量
-            self.stats['skipped_from_sources'] += source_stats.get('skipped_domains', 0)
-
-            total_added = len(domains) + total_path_domains
-            print(f"已添加 {total_added} 个域名到相应类别 (普通: {len(domains)}, 特定路径: {total_path_domains})")
+        # 🚀 并发预取所有在线数据源的内容，解析仍按配置顺序逐个进行
+        enabled_sources = [
+            source for source in self.config["sources"] if source.get("enabled", True)
+        ]
+        enabled_urls = list(dict.fromkeys(source["url"] for source in enabled_sources))
+        executor = None
+        try:
+            if enabled_urls:
+                max_workers = min(
+                    self.config["request_config"].get("max_workers", 16), len(enabled_urls)
+                )
+                executor = ThreadPoolExecutor(max_workers=max_workers)
+                self._prefetched_content = {
+                    url: executor.submit(self._download_source, url) for url in enabled_urls
+                }
 
-            # 清除临时变量
-            delattr(self, '_current_source_action')
+            # 从在线源收集域名
+            for source in enabled_sources:
+                self._collect_source_domains(source, categorized_domains)
+        finally:
+            # 中途出错时取消尚未开始的下载，并释放未被消费的预取结果
+            if executor:
+                for future in self._prefetched_content.values():
+                    future.cancel()
+                executor.shutdown()
+            self._prefetched_content = {}
 
         # 从自定义规则文件加载
         print(f"\n处理自定义规则文件...")
@@ -2589,13 +3357,9 @@ class SearXNGHostnamesGenerator:
                 )
 
                 # 累加统计信息
-                self.stats['total_rules'] += source_stats['total_rules']
-                self.stats['parsed_domains'] += source_stats['parsed_domains']
-                self.stats['invalid_domains'] += source_stats['invalid_domains']
-                self.stats['ignored_comments'] += source_stats['ignored_comments']
-                self.stats['csv_parsed_rows'] += source_stats.get('csv_parsed_rows', 0)
-                self.stats['csv_invalid_urls'] += source_stats.get('csv_invalid_urls', 0)
-                self.stats['csv_extracted_domains'] += source_stats.get('csv_extracted_domains', 0)
+                self.stats.update(
+                    {key: source_stats.get(key, 0) for key in _CUSTOM_SOURCE_STAT_KEYS}
+                )
 
                 # 将域名添加到相应类别
                 if action in categorized_domains:
@@ -2613,7 +3377,7 @@ class SearXNGHostnamesGenerator:
 
         return categorized_domains
 
-    def sort_rules(self, rules: Union[Dict, List]) -> Union[Dict, List]:
+    def sort_rules(self, rules: Union[Dict, List, Set]) -> Union[Dict, List]:
         """
         对规则进行排序
 
@@ -2625,9 +3389,9 @@ class SearXNGHostnamesGenerator:
         """
         if isinstance(rules, dict):
             # 对字典按键排序
-            return OrderedDict(sorted(rules.items()))
-        elif isinstance(rules, list):
-            # 对列表按值排序
+            return dict(sorted(rules.items()))
+        elif isinstance(rules, (list, set, frozenset)):
+            # 对列表（或已去重的集合）按值排序
             return sorted(rules)
         else:
             return rules
@@ -2661,19 +3425,10 @@ class SearXNGHostnamesGenerator:
         # 收集域名
         categorized_domains = self.collect_domains()
 
-        # 处理自动分类替换规则
-        auto_replace_rules = {}
-        for rule in self.auto_classify_rules:
-            if rule['action'] == 'replace':
-                old_regex = f"(.*\\.)?{re.escape(rule['old_domain'])}$"
-                auto_replace_rules[old_regex] = rule['new_domain']
-
         rules = {}
 
-        # 替换规则 (字典格式)
-        all_replace_rules = {}
-        all_replace_rules.update(self.config["replace_rules"])
-        all_replace_rules.update(auto_replace_rules)
+        # 替换规则 (字典格式)，自动分类替换规则已在建立索引时转为正则表达式
+        all_replace_rules = {**self.config["replace_rules"], **self._replace_rules}
 
         if all_replace_rules:
             rules["replace"] = all_replace_rules
@@ -2685,89 +3440,107 @@ class SearXNGHostnamesGenerator:
 
         # 移除规则 (列表格式) - 使用优化的合并
         print(f"\n生成移除规则...")
-        remove_rules = []
-        remove_rules.extend(self.config["fixed_remove"])
+        remove_rules = set(self.config["fixed_remove"])  # 直接以集合收集，去重后在最后统一排序
 
         # 记录固定移除规则数量
         fixed_remove_count = len(self.config["fixed_remove"])
 
-        if categorized_domains["remove"]:
-            print(f"正在优化 {len(categorized_domains['remove'])} 个移除域名...")
-            self.category_domain_counts["remove"] = len(categorized_domains["remove"]) + fixed_remove_count
-            merged_remove_rules = self.merge_domains_to_regex(categorized_domains["remove"])
-            remove_rules.extend(merged_remove_rules)
+        remove_domains = categorized_domains["remove"]
+        if remove_domains:
+            remove_domain_count = len(remove_domains)
+            print(f"正在优化 {remove_domain_count} 个移除域名...")
+            self.category_domain_counts["remove"] = remove_domain_count + fixed_remove_count
+            merged_remove_rules = self.merge_domains_to_regex(remove_domains)
+            remove_rules.update(merged_remove_rules)
         else:
             self.category_domain_counts["remove"] = fixed_remove_count
 
-        if remove_rules:
-            rules["remove"] = remove_rules
-        else:
-            # 创建空移除规则列表，确保文件被创建
-            rules["remove"] = []
+        # 即使为空也保留该类别，确保文件被创建
+        rules["remove"] = remove_rules
 
         # 低优先级规则 (列表格式) - 使用优化的合并
         print(f"\n生成低优先级规则...")
-        low_priority_rules = []
-        low_priority_rules.extend(self.config["fixed_low_priority"])
+        low_priority_rules = set(self.config["fixed_low_priority"])  # 直接以集合收集，去重后在最后统一排序
 
         # 记录固定低优先级规则数量
         fixed_low_priority_count = len(self.config["fixed_low_priority"])
 
-        if categorized_domains["low_priority"]:
-            print(f"正在优化 {len(categorized_domains['low_priority'])} 个低优先级域名...")
-            self.category_domain_counts["low_priority"] = len(categorized_domains["low_priority"]) + fixed_low_priority_count
-            merged_low_priority_rules = self.merge_domains_to_regex(categorized_domains["low_priority"])
-            low_priority_rules.extend(merged_low_priority_rules)
+        low_priority_domains = categorized_domains["low_priority"]
+        if low_priority_domains:
+            low_priority_domain_count = len(low_priority_domains)
+            print(f"正在优化 {low_priority_domain_count} 个低优先级域名...")
+            self.category_domain_counts["low_priority"] = (
+                low_priority_domain_count + fixed_low_priority_count
+            )
+            merged_low_priority_rules = self.merge_domains_to_regex(low_priority_domains)
+            low_priority_rules.update(merged_low_priority_rules)
         else:
             self.category_domain_counts["low_priority"] = fixed_low_priority_count
 
-        if low_priority_rules:
-            rules["low_priority"] = low_priority_rules
-        else:
-            # 创建空低优先级规则列表，确保文件被创建
-            rules["low_priority"] = []
+        # 即使为空也保留该类别，确保文件被创建
+        rules["low_priority"] = low_priority_rules
 
         # 低优先级 + 移除组合规则 (列表格式)
         print(f"\n生成低优先级(含移除)组合规则...")
-        low_priority_all_rules = sorted(set(remove_rules + low_priority_rules))
+        low_priority_all_rules = remove_rules | low_priority_rules  # 排序在最后统一进行
         rules["low_priority_all"] = low_priority_all_rules
         self.category_domain_counts["low_priority_all"] = len(
-            set(categorized_domains["remove"] | categorized_domains["low_priority"])
+            remove_domains.union(low_priority_domains)
         ) + fixed_remove_count + fixed_low_priority_count
 
         # 高优先级规则 (列表格式) - 使用优化的合并
         print(f"\n生成高优先级规则...")
-        high_priority_rules = []
-        high_priority_rules.extend(self.config["fixed_high_priority"])
+        high_priority_rules = set(self.config["fixed_high_priority"])  # 直接以集合收集，去重后在最后统一排序
 
         # 记录固定高优先级规则数量
         fixed_high_priority_count = len(self.config["fixed_high_priority"])
 
-        if categorized_domains["high_priority"]:
-            print(f"正在优化 {len(categorized_domains['high_priority'])} 个高优先级域名...")
-            self.category_domain_counts["high_priority"] = len(categorized_domains["high_priority"]) + fixed_high_priority_count
-            merged_high_priority_rules = self.merge_domains_to_regex(categorized_domains["high_priority"])
-            high_priority_rules.extend(merged_high_priority_rules)
+        high_priority_domains = categorized_domains["high_priority"]
+        if high_priority_domains:
+            high_priority_domain_count = len(high_priority_domains)
+            print(f"正在优化 {high_priority_domain_count} 个高优先级域名...")
+            self.category_domain_counts["high_priority"] = (
+                high_priority_domain_count + fixed_high_priority_count
+            )
+            merged_high_priority_rules = self.merge_domains_to_regex(high_priority_domains)
+            high_priority_rules.update(merged_high_priority_rules)
         else:
             self.category_domain_counts["high_priority"] = fixed_high_priority_count
 
-        if high_priority_rules:
-            rules["high_priority"] = high_priority_rules
-        else:
-            # 创建空高优先级规则列表，确保文件被创建
-            rules["high_priority"] = []
+        # 即使为空也保留该类别，确保文件被创建
+        rules["high_priority"] = high_priority_rules
 
-        # 对所有规则进行排序和去重
+        # 对所有规则进行排序：替换规则按键排序，其余规则集合已去重，按值排序
         for rule_type in rules:
-            if rule_type == "replace":
-                # 替换规则按键排序
-                rules[rule_type] = self.sort_rules(rules[rule_type])
-            else:
-                # 列表规则去重并排序
-                rules[rule_type] = self.sort_rules(list(set(rules[rule_type])))
+            rules[rule_type] = self.sort_rules(rules[rule_type])
 
         return rules
 
+    @staticmethod
+    def _write_if_changed(filepath: str, content: bytes) -> bool:
+        """
+        仅当内容与现有文件不同时写入文件
+        内容未变化时保留原文件（包括修改时间），避免无意义的磁盘写入和下游重新加载
+
+        Args:
+            filepath: 文件路径
+            content: 完整的文件内容（UTF-8 字节）
+
+        Returns:
+            bool: 是否写入了文件
+        """
+        try:
+            if os.path.getsize(filepath) == len(content):
+                with open(filepath, 'rb') as f:
+                    if f.read() == content:
+                        return False
+        except OSError:
+            pass
+
+        with open(filepath, 'wb') as f:
+            f.write(content)
+        return True
+
     def save_separate_files(self, rules: Dict[str, any]) -> None:
         """
         保存为分离的文件
@@ -2796,26 +3569,35 @@ class SearXNGHostnamesGenerator:
                 rule_data = rules.get(rule_type, [] if rule_type != "replace" else {})
 
                 try:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        # 简化的文件头注释
-                        rule_count = len(rule_data) if isinstance(rule_data, (list, dict)) else 0
-                        domain_count = self.category_domain_counts.get(rule_type, 0)
-
-                        f.write(f"# SearXNG {rule_type} rules\n")
-                        f.write(f"# Total rules: {rule_count}, Total domains: {domain_count}\n")
-                        f.write("\n")
-
-                        # 直接写入规则内容，不包含顶级键
-                        if rule_data or rule_type in rules:  # 只有当有数据或原本就在rules中才写入内容
-                            yaml.dump(rule_data, f, default_flow_style=False, allow_unicode=True, indent=2)
+                    # 简化的文件头注释（预先编码为 UTF-8 字节）
+                    rule_count = len(rule_data) if isinstance(rule_data, (list, dict)) else 0
+                    domain_count = self.category_domain_counts.get(rule_type, 0)
+
+                    header = (
+                        f"# SearXNG {rule_type} rules\n"
+                        f"# Total rules: {rule_count}, Total domains: {domain_count}\n"
+                        "\n"
+                    ).encode('utf-8')
+
+                    # 直接写入规则内容，不包含顶级键
+                    if rule_data or rule_type in rules:  # 只有当有数据或原本就在rules中才写入内容
+                        # 规则在 generate_rules 中已排序，无需输出时再次排序
+                        body = yaml.dump(
+                            rule_data,
+                            default_flow_style=False, allow_unicode=True, indent=2,
+                            sort_keys=False, encoding='utf-8', Dumper=YamlDumper
+                        )
+                    else:
+                        # 写入空内容标记
+                        if rule_type == "replace":
+                            body = b"{}\n"  # 空字典
                         else:
-                            # 写入空内容标记
-                            if rule_type == "replace":
-                                f.write("{}\n")  # 空字典
-                            else:
-                                f.write("[]\n")  # 空列表
+                            body = b"[]\n"  # 空列表
 
-                    print(f"已保存 {rule_type} 规则到: {filepath} ({rule_count} 条规则)")
+                    if self._write_if_changed(filepath, header + body):
+                        print(f"已保存 {rule_type} 规则到: {filepath} ({rule_count} 条规则)")
+                    else:
+                        print(f"{rule_type} 规则未变化，跳过写入: {filepath} ({rule_count} 条规则)")
 
                     # 在主配置中引用外部文件
                     main_config["hostnames"][rule_type] = filename
@@ -2827,13 +3609,19 @@ class SearXNGHostnamesGenerator:
         if main_config["hostnames"]:
             main_config_path = os.path.join(output_dir, files_config["main_config"])
             try:
-                with open(main_config_path, 'w', encoding='utf-8') as f:
-                    # 简化的主配置文件头
-                    f.write("# SearXNG hostnames configuration\n")
-                    f.write("# This file references external rule files\n")
-                    f.write("\n")
-                    yaml.dump(main_config, f, default_flow_style=False, allow_unicode=True, indent=2)
-                print(f"已保存主配置到: {main_config_path}")
+                # 简化的主配置文件头
+                content = (b"# SearXNG hostnames configuration\n"
+                           b"# This file references external rule files\n"
+                           b"\n"
+                           + yaml.dump(
+                               main_config,
+                               default_flow_style=False, allow_unicode=True, indent=2,
+                               encoding='utf-8', Dumper=YamlDumper
+                           ))
+                if self._write_if_changed(main_config_path, content):
+                    print(f"已保存主配置到: {main_config_path}")
+                else:
+                    print(f"主配置未变化，跳过写入: {main_config_path}")
             except Exception as e:
                 print(f"保存主配置失败: {e}")
 
@@ -2862,18 +3650,29 @@ class SearXNGHostnamesGenerator:
         filepath = os.path.join(output_dir, "hostnames.yml")
 
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                # 简化的文件头注释
-                total_rules = sum(len(rule_data) if isinstance(rule_data, (list, dict)) else 0 for rule_data in rules.values())
-                total_domains = sum(self.category_domain_counts.values())
-
-                f.write("# SearXNG hostnames configuration\n")
-                f.write(f"# Total rules: {total_rules}, Total domains: {total_domains}\n")
-                f.write("\n")
-
-                yaml.dump(hostnames_config, f, default_flow_style=False, allow_unicode=True, indent=2)
-
-            print(f"已保存完整配置到: {filepath}")
+            # 简化的文件头注释
+            total_rules = sum(
+                len(rule_data) if isinstance(rule_data, (list, dict)) else 0
+                for rule_data in rules.values()
+            )
+            total_domains = sum(self.category_domain_counts.values())
+
+            header = (
+                "# SearXNG hostnames configuration\n"
+                f"# Total rules: {total_rules}, Total domains: {total_domains}\n"
+                "\n"
+            ).encode('utf-8')
+            body = yaml.dump(
+                hostnames_config,
+                default_flow_style=False, allow_unicode=True, indent=2,
+                encoding='utf-8', Dumper=YamlDumper
+            )
+            content = header + body
+
+            if self._write_if_changed(filepath, content):
+                print(f"已保存完整配置到: {filepath}")
+            else:
+                print(f"完整配置未变化，跳过写入: {filepath}")
 
         except Exception as e:
             print(f"保存配置失败: {e}")
@@ -2905,6 +3704,8 @@ class SearXNGHostnamesGenerator:
             print("\n用户中断操作")
         except Exception as e:
             print(f"\n生成过程中发生错误: {e}")
+            # 管道输出时 stdout 为块缓冲，先刷新以保证错误信息排在 stderr 的回溯之前
+            sys.stdout.flush()
             import traceback
             traceback.print_exc()
             sys.exit(1)
@@ -2923,13 +3724,7 @@ class SearXNGHostnamesGenerator:
         total_domains = 0
 
         for rule_type, rule_data in rules.items():
-            if isinstance(rule_data, dict):
-                rule_count = len(rule_data)
-                domain_count = self.category_domain_counts.get(rule_type, 0)
-                print(f"  {rule_type} 规则: {rule_count} 条 (包含 {domain_count} 个域名)")
-                total_rules += rule_count
-                total_domains += domain_count
-            elif isinstance(rule_data, list):
+            if isinstance(rule_data, (dict, list)):
                 rule_count = len(rule_data)
                 domain_count = self.category_domain_counts.get(rule_type, 0)
                 print(f"  {rule_type} 规则: {rule_count} 条 (包含 {domain_count} 个域名)")
@@ -2942,24 +3737,24 @@ class SearXNGHostnamesGenerator:
         print(f"  - 总输入规则: {self.stats['total_rules']:,}")
         print(f"  - 成功解析域名: {self.stats['parsed_domains']:,}")
         print(f"  - 忽略(特定路径): {self.stats['ignored_with_path']:,}")
-        print(f"  - 🔧 特定路径->低优先级: {self.stats.get('path_to_low_priority', 0):,}")
-        print(f"  - 🔧 特定路径保持原动作: {self.stats.get('path_kept_action', 0):,}")
+        print(f"  - 🔧 特定路径->低优先级: {self.stats['path_to_low_priority']:,}")
+        print(f"  - 🔧 特定路径保持原动作: {self.stats['path_kept_action']:,}")
         print(f"  - 忽略(注释): {self.stats['ignored_comments']:,}")
         print(f"  - 忽略(无效域名): {self.stats['invalid_domains']:,}")
         print(f"  - 重复域名: {self.stats['duplicate_domains']:,}")
 
-        if self.stats.get('wildcard_rules_processed', 0) > 0:
-            print(f"  - 🔧 通配符规则处理: {self.stats.get('wildcard_rules_processed', 0):,}")
-        if self.stats.get('auto_classified', 0) > 0:
-            print(f"  - 自动分类处理: {self.stats.get('auto_classified', 0):,}")
-        if self.stats.get('auto_added', 0) > 0:
-            print(f"  - 主动添加域名: {self.stats.get('auto_added', 0):,}")
-        if self.stats.get('skipped_from_sources', 0) > 0:
-            print(f"  - 从数据源跳过: {self.stats.get('skipped_from_sources', 0):,}")
-        if self.stats.get('v2ray_with_tags', 0) > 0:
-            print(f"  - v2ray 带标签规则: {self.stats.get('v2ray_with_tags', 0):,}")
-        if self.stats.get('csv_extracted_domains', 0) > 0:
-            print(f"  - CSV 提取域名: {self.stats.get('csv_extracted_domains', 0):,}")
+        if self.stats['wildcard_rules_processed'] > 0:
+            print(f"  - 🔧 通配符规则处理: {self.stats['wildcard_rules_processed']:,}")
+        if self.stats['auto_classified'] > 0:
+            print(f"  - 自动分类处理: {self.stats['auto_classified']:,}")
+        if self.stats['auto_added'] > 0:
+            print(f"  - 主动添加域名: {self.stats['auto_added']:,}")
+        if self.stats['skipped_from_sources'] > 0:
+            print(f"  - 从数据源跳过: {self.stats['skipped_from_sources']:,}")
+        if self.stats['v2ray_with_tags'] > 0:
+            print(f"  - v2ray 带标签规则: {self.stats['v2ray_with_tags']:,}")
+        if self.stats['csv_extracted_domains'] > 0:
+            print(f"  - CSV 提取域名: {self.stats['csv_extracted_domains']:,}")
 
         print(f"\n📁 输出目录: {self.config['output']['directory']}")
 
@@ -2967,14 +3762,15 @@ class SearXNGHostnamesGenerator:
         specific_path_action = self.config['parsing'].get('specific_path_action', 'keep_action')
         print(f"  - 处理模式: {specific_path_action}")
         if specific_path_action == 'low_priority':
-            print(f"  - 转为低优先级的数量: {self.stats.get('path_to_low_priority', 0):,}")
+            print(f"  - 转为低优先级的数量: {self.stats['path_to_low_priority']:,}")
             print(f"  - 效果: 所有特定路径规则强制设置为低优先级")
         elif specific_path_action == 'keep_action':
-            print(f"  - 保持原动作的数量: {self.stats.get('path_kept_action', 0):,}")
-            print(f"  - 转为低优先级的数量: {self.stats.get('path_to_low_priority', 0):,}")
+            print(f"  - 保持原动作的数量: {self.stats['path_kept_action']:,}")
+            print(f"  - 转为低优先级的数量: {self.stats['path_to_low_priority']:,}")
             print(f"  - 效果: 特定路径规则保持源的原始动作 (推荐)")
         elif specific_path_action == 'smart':
-            print(f"  - 智能处理的数量: {self.stats.get('path_kept_action', 0):,} + {self.stats.get('path_to_low_priority', 0):,}")
+            print(f"  - 智能处理的数量: {self.stats['path_kept_action']:,} "
+                  f"+ {self.stats['path_to_low_priority']:,}")
             print(f"  - 效果: remove->low_priority，其他动作保持不变")
         elif specific_path_action == 'ignore':
             print(f"  - 效果: 特定路径规则被完全忽略")
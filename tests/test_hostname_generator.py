@@ -0,0 +1,220 @@
+"""
+hostname_generator 的单元测试
+覆盖规则合并的正确性、自动分类索引查找与规则长度限制
+"""
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+import unittest
+from typing import Dict, List, Set, Tuple
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hostname_generator import SearXNGHostnamesGenerator  # noqa: E402
+
+
+# 随机生成域名时使用的字符、前缀与顶级域名（共享前缀以触发前缀/后缀合并）
+_LABEL_CHARS = "abcdefghij-"
+_LABEL_PREFIXES = ["", "app", "apple", "blog", "news", "www"]
+_TLDS = ["com", "net", "org", "cn", "com.cn", "co.uk", "io"]
+
+
+def _random_label(rng: random.Random) -> str:
+    """
+    生成一个合法的域名标签
+    """
+    body = "".join(rng.choice(_LABEL_CHARS) for _ in range(rng.randint(1, 6))).strip("-")
+    return (rng.choice(_LABEL_PREFIXES) + body) or "x"
+
+
+def _random_domains(rng: random.Random, count: int) -> Set[str]:
+    """
+    生成一组随机域名
+    """
+    domains = set()
+    while len(domains) < count:
+        labels = [_random_label(rng) for _ in range(rng.randint(1, 2))]
+        domains.add(".".join(labels + [rng.choice(_TLDS)]))
+    return domains
+
+
+def _make_generator(config: Dict) -> SearXNGHostnamesGenerator:
+    """
+    使用临时配置文件创建生成器，并屏蔽初始化时的输出
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = os.path.join(temp_dir, "config.yml")
+        with open(config_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(config, f, allow_unicode=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return SearXNGHostnamesGenerator(config_path)
+
+
+def _merge(generator: SearXNGHostnamesGenerator, domains: Set[str]) -> List[str]:
+    """
+    合并域名为规则，并屏蔽合并过程中的输出
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return generator.merge_domains_to_regex(domains)
+
+
+def _linear_match(rules: List[Tuple[str, str]], domain: str, actions: Set[str]) -> Tuple:
+    """
+    按规则顺序逐条匹配，返回第一条匹配的 (动作, 规则域名)
+    """
+    domain_lower = domain.lower()
+    for action, rule_domain in rules:
+        if action not in actions:
+            continue
+        pattern = rule_domain.lower()
+        if pattern.startswith("*."):
+            pattern = pattern[2:]
+            if domain_lower == pattern or domain_lower.endswith("." + pattern):
+                return action, rule_domain
+        elif domain_lower == pattern:
+            return action, rule_domain
+    return None
+
+
+class MergeDomainsToRegexTest(unittest.TestCase):
+    """
+    合并后的规则应当恰好匹配输入域名及其子域名
+    """
+
+    def _assert_exact(self, rules: List[str], domains: Set[str], others: Set[str]) -> None:
+        compiled = [re.compile(rule) for rule in rules]
+
+        def matched(host: str) -> bool:
+            return any(pattern.fullmatch(host) for pattern in compiled)
+
+        for domain in domains:
+            self.assertTrue(matched(domain), domain)
+            self.assertTrue(matched("sub." + domain), "sub." + domain)
+
+        for other in others:
+            expected = any(other == d or other.endswith("." + d) for d in domains)
+            self.assertEqual(matched(other), expected, other)
+
+    def _check(self, optimization: Dict, seed: int) -> List[str]:
+        rng = random.Random(seed)
+        domains = _random_domains(rng, 300)
+        # 负样本：与输入域名仅相差一个字符或标签的域名，以及其它随机域名
+        others = _random_domains(rng, 300)
+        for domain in rng.sample(sorted(domains), 100):
+            others.update({"x" + domain, domain + "x", domain[1:], domain.replace(".", "-", 1)})
+
+        generator = _make_generator({
+            "auto_classify": {"enabled": False},
+            "optimization": optimization,
+        })
+        rules = _merge(generator, domains)
+        self._assert_exact(rules, domains, others)
+        return rules
+
+    def test_default_optimization(self):
+        self._check({}, seed=1)
+
+    def test_without_tld_grouping(self):
+        self._check({"group_by_tld": False}, seed=2)
+
+    def test_without_prefix_optimization(self):
+        self._check({"enable_prefix_optimization": False, "enable_advanced_tld_merge": False},
+                    seed=3)
+
+    def test_small_max_rule_length(self):
+        max_rule_length = 120
+        rules = self._check({"max_rule_length": max_rule_length}, seed=4)
+        self.assertGreater(len(rules), 1)
+        for rule in rules:
+            self.assertLessEqual(len(rule), max_rule_length, rule)
+
+    def test_small_max_rule_length_without_tld_grouping(self):
+        max_rule_length = 80
+        rules = self._check({"group_by_tld": False, "max_rule_length": max_rule_length}, seed=5)
+        for rule in rules:
+            self.assertLessEqual(len(rule), max_rule_length, rule)
+
+    def test_max_domains_per_rule(self):
+        rng = random.Random(6)
+        domains = _random_domains(rng, 100)
+        generator = _make_generator({
+            "auto_classify": {"enabled": False},
+            "optimization": {"group_by_tld": False, "max_domains_per_rule": 7},
+        })
+        rules = _merge(generator, domains)
+        self.assertEqual(len(rules), -(-len(domains) // 7))
+        self._assert_exact(rules, domains, set())
+
+
+class AutoClassifyIndexTest(unittest.TestCase):
+    """
+    索引查找的结果应与按顺序逐条匹配的结果一致
+    """
+
+    def setUp(self):
+        rng = random.Random(7)
+        pool = sorted(_random_domains(rng, 60))
+        self.rules = []
+        for _ in range(200):
+            action = rng.choice(["skip", "remove", "low_priority", "high_priority"])
+            rule_domain = rng.choice(pool)
+            if rng.random() < 0.3:
+                rule_domain = "*." + rule_domain.split(".", 1)[-1]
+            if rng.random() < 0.2:
+                rule_domain = rule_domain.upper()
+            self.rules.append((action, rule_domain))
+
+        self.generator = _make_generator({
+            "auto_classify": {
+                "enabled": True,
+                "sources": [],
+                "rules": [f"{action}:{rule_domain}" for action, rule_domain in self.rules],
+            },
+        })
+
+        # 查询样本：规则域名本身、其子域名、父域名以及无关域名
+        self.samples = set(pool) | _random_domains(rng, 60)
+        for domain in pool:
+            self.samples.add("a." + domain)
+            self.samples.add(domain.split(".", 1)[-1])
+            self.samples.add(domain.upper())
+
+    def test_get_auto_classify_action(self):
+        actions = {"remove", "low_priority", "high_priority"}
+        for domain in self.samples:
+            expected = _linear_match(self.rules, domain, actions)
+            action, reason = self.generator.get_auto_classify_action(domain)
+            if expected is None:
+                self.assertEqual((action, reason), (None, ""), domain)
+            else:
+                self.assertEqual(action, expected[0], domain)
+                self.assertEqual(reason, f"自动分类规则: {expected[1]}", domain)
+
+    def test_should_skip_domain_from_source(self):
+        for domain in self.samples:
+            expected = _linear_match(self.rules, domain, {"skip"})
+            should_skip, reason = self.generator.should_skip_domain_from_source(domain)
+            self.assertEqual(should_skip, expected is not None, domain)
+            if expected is not None:
+                self.assertEqual(reason, f"自动分类跳过规则: {expected[1]} (仅影响数据源处理)")
+
+    def test_get_all_auto_classify_actions_for_domain(self):
+        for domain in self.samples:
+            expected = [
+                (action, f"自动分类规则: {rule_domain}")
+                for action, rule_domain in self.rules
+                if _linear_match([(action, rule_domain)], domain, {action})
+            ]
+            self.assertEqual(
+                self.generator.get_all_auto_classify_actions_for_domain(domain), expected, domain
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()